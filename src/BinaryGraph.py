@@ -0,0 +1,205 @@
+# BinaryGraph.py
+#
+# Written by Larry Holder (holder@wsu.edu).
+#
+# Copyright (c) 2017-2021. Washington State University.
+#
+# Binary graph format, whose columns are read in place from a memory map
+# of the file rather than parsed. The file starts with a header: the magic bytes, format
+# version, numbers of vertices, edges and labels, and the offset and byte
+# length of each section. Each section is one column, stored as a little-
+# endian array: vertex and edge IDs (UTF-8 strings, concatenated, with an
+# array of their end offsets), vertex timestamps and attribute indices,
+# edge source and target vertex indices, direction, timestamps and
+# attribute indices, and the label dictionary (a JSON list of the
+# distinct attribute dictionaries, indexed by attribute index). Vertices and edges are stored in graph order, and edges
+# are added to their vertices in that order when loaded, as when loading
+# from JSON.
+#
+# Usage: python BinaryGraph.py <input JSON graph file> <output binary graph file>
+
+import array
+import gc
+import json
+import mmap
+import struct
+import sys
+import Graph
+
+MAGIC = b'SUBDUEGB'
+VERSION = 1
+
+# Sections in file order: (name, array typecode)
+gSections = [
+    ('labels', 'B'),
+    ('vertexIdEnds', 'Q'),
+    ('vertexIds', 'B'),
+    ('vertexTimestamps', 'q'),
+    ('vertexLabels', 'I'),
+    ('edgeIdEnds', 'Q'),
+    ('edgeIds', 'B'),
+    ('edgeSources', 'I'),
+    ('edgeTargets', 'I'),
+    ('edgeDirected', 'B'),
+    ('edgeTimestamps', 'q'),
+    ('edgeLabels', 'I'),
+]
+
+gHeader = struct.Struct('<8sIQQQ')
+gSectionEntry = struct.Struct('<QQ') # offset, byte length
+
+def IsBinaryGraphFile(fileName):
+    """Returns True if the given file starts with the magic bytes of the binary graph format."""
+    with open(fileName, 'rb') as graphFile:
+        return (graphFile.read(len(MAGIC)) == MAGIC)
+
+def WriteBinaryGraph(graph, fileName):
+    """Write given graph to given file name in the binary graph format."""
+    labelIds = {} # id of attribute dictionary -> its index in file; elements with the same attributes share one
+    labels = []
+    def FileLabel(attributes):
+        if id(attributes) not in labelIds:
+            labelIds[id(attributes)] = len(labels)
+            labels.append(attributes)
+        return labelIds[id(attributes)]
+    vertexIndex = {}
+    columns = {}
+    columns['vertexTimestamps'] = array.array('q')
+    columns['vertexLabels'] = array.array('I')
+    vertexIds = []
+    for vertex in graph.vertices.values():
+        vertexIndex[vertex] = len(vertexIds)
+        vertexIds.append(vertex.id)
+        columns['vertexTimestamps'].append(vertex.timestamp)
+        columns['vertexLabels'].append(FileLabel(vertex.attributes))
+    columns['edgeSources'] = array.array('I')
+    columns['edgeTargets'] = array.array('I')
+    columns['edgeDirected'] = array.array('B')
+    columns['edgeTimestamps'] = array.array('q')
+    columns['edgeLabels'] = array.array('I')
+    edgeIds = []
+    for edge in graph.edges.values():
+        edgeIds.append(edge.id)
+        columns['edgeSources'].append(vertexIndex[edge.source])
+        columns['edgeTargets'].append(vertexIndex[edge.target])
+        columns['edgeDirected'].append(1 if edge.directed else 0)
+        columns['edgeTimestamps'].append(edge.timestamp)
+        columns['edgeLabels'].append(FileLabel(edge.attributes))
+    columns['vertexIdEnds'], columns['vertexIds'] = EncodeStrings(vertexIds)
+    columns['edgeIdEnds'], columns['edgeIds'] = EncodeStrings(edgeIds)
+    columns['labels'] = array.array('B', json.dumps(labels).encode('utf-8'))
+    # Lay out sections after the header, each aligned to 8 bytes
+    sectionData = []
+    offset = gHeader.size + (len(gSections) * gSectionEntry.size)
+    sectionEntries = []
+    for name, typecode in gSections:
+        column = columns[name]
+        if sys.byteorder != 'little':
+            column.byteswap()
+        data = column.tobytes()
+        offset += (-offset) % 8
+        sectionEntries.append((offset, len(data)))
+        sectionData.append(data)
+        offset += len(data)
+    with open(fileName, 'wb') as graphFile:
+        graphFile.write(gHeader.pack(MAGIC, VERSION, len(vertexIds), len(edgeIds), len(labels)))
+        for sectionOffset, length in sectionEntries:
+            graphFile.write(gSectionEntry.pack(sectionOffset, length))
+        for (sectionOffset, length), data in zip(sectionEntries, sectionData):
+            graphFile.write(b'\0' * (sectionOffset - graphFile.tell()))
+            graphFile.write(data)
+
+def EncodeStrings(strings):
+    """Returns the end offsets and concatenated UTF-8 bytes of the given strings."""
+    ends = array.array('Q')
+    data = bytearray()
+    for string in strings:
+        data += string.encode('utf-8')
+        ends.append(len(data))
+    return ends, array.array('B', data)
+
+def DecodeStrings(ends, data):
+    """Returns the strings whose UTF-8 bytes are concatenated in data (a bytes-like object, e.g., a memoryview), given
+    their end offsets."""
+    strings = []
+    start = 0
+    for end in ends:
+        strings.append(str(data[start:end], 'utf-8'))
+        start = end
+    return strings
+
+def ReadBinaryGraph(fileName):
+    """Read graph from given file in the binary graph format. The file is memory-mapped, and the columns are read in
+    place through memoryviews cast to their types, without copying them out of the map (except on big-endian
+    platforms, where the little-endian values are copied and byte-swapped). Garbage collection is paused while the
+    graph is built."""
+    with open(fileName, 'rb') as graphFile:
+        with mmap.mmap(graphFile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version, numVertices, numEdges, numLabels = gHeader.unpack_from(data, 0)
+            if magic != MAGIC:
+                raise ValueError(fileName + " is not a binary graph file")
+            if version != VERSION:
+                raise ValueError("unsupported binary graph version " + str(version) + " in " + fileName)
+            dataView = memoryview(data)
+            columns = {}
+            gcEnabled = gc.isenabled()
+            gc.disable() # all objects created are kept in the graph, so collecting them while loading frees nothing
+            try:
+                for sectionNum, (name, typecode) in enumerate(gSections):
+                    offset, length = gSectionEntry.unpack_from(data, gHeader.size + (sectionNum * gSectionEntry.size))
+                    columns[name] = dataView[offset:offset+length].cast(typecode)
+                    if sys.byteorder != 'little':
+                        column = array.array(typecode, columns[name])
+                        column.byteswap()
+                        columns[name].release()
+                        columns[name] = column
+                return GraphFromColumns(columns)
+            finally:
+                if gcEnabled:
+                    gc.enable()
+                # the map can only be closed once no memoryview of it is left
+                for column in columns.values():
+                    if isinstance(column, memoryview):
+                        column.release()
+                dataView.release()
+
+def GraphFromColumns(columns):
+    """Returns the graph stored in the given columns of a binary graph file."""
+    labels = json.loads(str(columns['labels'], 'utf-8'))
+    labelMap = [(Graph.LabelId(attributes), Graph.SharedAttributes(attributes)) for attributes in labels]
+    vertexIds = DecodeStrings(columns['vertexIdEnds'], columns['vertexIds'])
+    edgeIds = DecodeStrings(columns['edgeIdEnds'], columns['edgeIds'])
+    graph = Graph.Graph()
+    vertexList = []
+    for vertexId, timestamp, label in zip(vertexIds, columns['vertexTimestamps'], columns['vertexLabels']):
+        vertex = Graph.Vertex(vertexId)
+        vertex.timestamp = timestamp
+        vertex.label, vertex.attributes = labelMap[label]
+        graph.vertices[vertexId] = vertex
+        vertexList.append(vertex)
+    for edgeId, source, target, directed, timestamp, label in zip(edgeIds, columns['edgeSources'], columns['edgeTargets'],
+                                                                  columns['edgeDirected'], columns['edgeTimestamps'],
+                                                                  columns['edgeLabels']):
+        sourceVertex = vertexList[source]
+        targetVertex = vertexList[target]
+        edge = Graph.Edge(edgeId, sourceVertex, targetVertex, (directed == 1))
+        edge.timestamp = timestamp
+        edge.label, edge.attributes = labelMap[label]
+        graph.edges[edgeId] = edge
+        sourceVertex.add_edge(edge)
+        targetVertex.add_edge(edge)
+    return graph
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python BinaryGraph.py <input JSON graph file> <output binary graph file>")
+        sys.exit(1)
+    inputFile = open(sys.argv[1])
+    graph = Graph.Graph()
+    graph.load_from_json_stream(inputFile)
+    inputFile.close()
+    WriteBinaryGraph(graph, sys.argv[2])
+    print("Wrote " + str(len(graph.vertices)) + " vertices and " + str(len(graph.edges)) + " edges to " + sys.argv[2])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# CanonicalCode.py
+#
+# Written by Larry Holder (holder@wsu.edu).
+#
+# Copyright (c) 2017-2021. Washington State University.
+#
+# Computes a canonical code for a (small) graph, such that two graphs have
+# the same code if and only if they are isomorphic, respecting vertex and
+# edge labels, edge direction and temporal order. Pattern identity can then
+# be decided by comparing or hashing codes, rather than by graph matching.
+#
+# The code is found by individualization and refinement: vertices are
+# colored by their label and temporal order, and colors are refined by the
+# colors of each vertex's neighbors and connecting edges until stable. If
+# some vertices still share a color, each vertex of the first such color
+# is in turn given a color of its own and refinement continues. Each
+# branch ends with a distinct color per vertex, i.e., a vertex order, and
+# the code is the smallest graph encoding over all these orders. Vertices
+# that are twins (swapping them maps the graph onto itself) lead to the
+# same encodings, so only one of them is tried.
+
+def CanonicalCode(graph):
+    """Returns the canonical code of the given graph, caching it on the graph."""
+    if graph.canonicalCode is None:
+        graph.canonicalCode = ComputeCanonicalCode(graph)
+    return graph.canonicalCode
+
+def ComputeCanonicalCode(graph):
+    """Returns the canonical code of the given graph: a tuple of the vertex descriptors (label, temporal) in canonical
+    order, and a sorted tuple of edges (source position, target position, label, temporal, directed), where undirected
+    edges have source position <= target position."""
+    vertices = list(graph.vertices.values())
+    descriptors = {vertex: (vertex.label, vertex.temporal) for vertex in vertices}
+    neighbors = NeighborEdges(graph)
+    colors = RankColors({vertex: descriptors[vertex] for vertex in vertices})
+    colors = RefineColors(neighbors, colors)
+    return SearchCodes(graph, descriptors, neighbors, colors)
+
+def NeighborEdges(graph):
+    """Returns, for each vertex, a dictionary from each neighbor (possibly itself) to a sorted tuple of the connecting
+    edges, each described as (label, temporal, direction), where direction is 0 if undirected, 1 if out of the vertex,
+    2 if into the vertex, and 3 if a directed self-loop."""
+    neighbors = {vertex: {} for vertex in graph.vertices.values()}
+    for edge in graph.edges.values():
+        if edge.source is edge.target:
+            edgePairs = ((edge.source, edge.target, 3 if edge.directed else 0),)
+        elif edge.directed:
+            edgePairs = ((edge.source, edge.target, 1), (edge.target, edge.source, 2))
+        else:
+            edgePairs = ((edge.source, edge.target, 0), (edge.target, edge.source, 0))
+        for vertex, neighbor, direction in edgePairs:
+            neighborEdges = neighbors[vertex]
+            if neighbor not in neighborEdges:
+                neighborEdges[neighbor] = []
+            neighborEdges[neighbor].append((edge.label, edge.temporal, direction))
+    for neighborEdges in neighbors.values():
+        for neighbor in neighborEdges:
+            neighborEdges[neighbor] = tuple(sorted(neighborEdges[neighbor]))
+    return neighbors
+
+def RankColors(signatures):
+    """Returns colors numbering the given (comparable) vertex signatures in sorted order, so that equal signatures
+    get equal colors and colors do not depend on vertex identities."""
+    ranks = {signature: rank for rank, signature in enumerate(sorted(set(signatures.values())))}
+    return {vertex: ranks[signature] for vertex, signature in signatures.items()}
+
+def RefineColors(neighbors, colors):
+    """Returns colors refined by the colors of each vertex's neighbors and connecting edges, until the number
+    of colors is stable. A refined color always sorts within the range of the color it refines."""
+    numColors = len(set(colors.values()))
+    while True:
+        signatures = {}
+        for vertex, neighborEdges in neighbors.items():
+            neighborColors = tuple(sorted((colors[neighbor], edges) for neighbor, edges in neighborEdges.items()))
+            signatures[vertex] = (colors[vertex], neighborColors)
+        newColors = RankColors(signatures)
+        newNumColors = len(set(newColors.values()))
+        if newNumColors == numColors:
+            return colors
+        colors = newColors
+        numColors = newNumColors
+
+def SearchCodes(graph, descriptors, neighbors, colors):
+    """Returns the smallest graph encoding over all vertex orders reachable from the given colors by
+    individualization and refinement."""
+    colorCells = {}
+    for vertex, color in colors.items():
+        if color not in colorCells:
+            colorCells[color] = []
+        colorCells[color].append(vertex)
+    if len(colorCells) == len(colors):
+        return EncodeGraph(graph, descriptors, colors)
+    # Individualize each vertex, up to twins, of the lowest color shared by several vertices
+    cellColor = min(color for color, cell in colorCells.items() if len(cell) > 1)
+    bestCode = None
+    for vertex in NonTwinVertices(colorCells[cellColor], neighbors):
+        signatures = {other: (color, 1) for other, color in colors.items()}
+        signatures[vertex] = (cellColor, 0)
+        code = SearchCodes(graph, descriptors, neighbors, RefineColors(neighbors, RankColors(signatures)))
+        if (bestCode is None) or (code < bestCode):
+            bestCode = code
+    return bestCode
+
+def NonTwinVertices(cell, neighbors):
+    """Returns the vertices of the given cell, omitting any vertex that is a twin of an earlier one. Two vertices are
+    twins if they have the same neighbors with the same connecting edges (besides each other) and the same edges in
+    both directions between them, so that swapping them is an automorphism."""
+    representatives = []
+    for vertex in cell:
+        if not any(AreTwins(vertex, other, neighbors) for other in representatives):
+            representatives.append(vertex)
+    return representatives
+
+def AreTwins(vertex1, vertex2, neighbors):
+    neighborEdges1 = neighbors[vertex1]
+    neighborEdges2 = neighbors[vertex2]
+    if neighborEdges1.get(vertex1) != neighborEdges2.get(vertex2):
+        return False
+    if neighborEdges1.get(vertex2) != neighborEdges2.get(vertex1):
+        return False
+    others1 = {neighbor: edges for neighbor, edges in neighborEdges1.items() if neighbor not in (vertex1, vertex2)}
+    others2 = {neighbor: edges for neighbor, edges in neighborEdges2.items() if neighbor not in (vertex1, vertex2)}
+    return (others1 == others2)
+
+def EncodeGraph(graph, descriptors, colors):
+    """Returns the encoding of the graph with vertices ordered by their (distinct) colors."""
+    vertexCode = tuple(descriptor for color, descriptor in sorted((colors[vertex], descriptor) for vertex, descriptor in descriptors.items()))
+    edgeCode = []
+    for edge in graph.edges.values():
+        source = colors[edge.source]
+        target = colors[edge.target]
+        if (not edge.directed) and (target < source):
+            source, target = target, source
+        edgeCode.append((source, target, edge.label, edge.temporal, edge.directed))
+    return (vertexCode, tuple(sorted(edgeCode)))
@@ -0,0 +1,176 @@
+# Checkpoint.py
+#
+# Written by Larry Holder (holder@wsu.edu).
+#
+# Copyright (c) 2017-2021. Washington State University.
+#
+# Checkpoints of a Subdue run, from which the run can be resumed (see the
+# --checkpoint and --resume options). A checkpoint is written at the start
+# of each iteration, i.e., after each compression, and at the start of
+# each level of the beam search within an iteration. It holds the
+# parameters, the (compressed) graph, the patterns of earlier iterations,
+# and the state of the search: the number of patterns considered so far,
+# the parent beam and the discovered list.
+#
+# Everything is stored as plain tuples and lists, with the attribute
+# dictionaries of vertices and edges as given (pickling stores shared
+# dictionaries once), and pickled and compressed with zlib. The label
+# table is stored too, so that labels are interned in the same order.
+# The graph is encoded once per iteration, and patterns of the current
+# iteration refer to its vertices and edges by ID, so checkpoints within
+# an iteration only encode the search state. The file is replaced
+# atomically, so an interrupted write leaves the previous checkpoint.
+
+import os
+import pickle
+import zlib
+import Graph
+import Pattern
+
+CHECKPOINT_VERSION = 2
+
+# Parameters that may differ between the interrupted run and its resumption; all others are restored.
+gRuntimeParameters = ['workers', 'timeBudget', 'memoryBudget', 'checkpointFileName', 'resume', 'statsFileName']
+
+class Checkpoint:
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.parameters = None
+        self.iteration = 1
+        self.graphData = None # compressed records of the graph at the start of the iteration
+        self.patternRecords = [] # records of the patterns of each earlier iteration
+
+    def start_iteration(self, parameters, iteration, graph, patterns):
+        """Record the start of the given iteration on the given graph, after the given patterns of earlier iterations
+        (see Subdue), and write a checkpoint."""
+        self.parameters = dict(vars(parameters))
+        self.iteration = iteration
+        self.graphData = zlib.compress(pickle.dumps(GraphToRecords(graph), pickle.HIGHEST_PROTOCOL))
+        while len(self.patternRecords) < len(patterns):
+            patternList = patterns[len(self.patternRecords)]
+            self.patternRecords.append([PatternToRecords(pattern) for pattern in patternList])
+        self.write(None)
+
+    def save_level(self, patternCount, parentPatternList, discoveredPatternList):
+        """Write a checkpoint at the start of a level of the search in the current iteration."""
+        parentPatterns = [PatternToIdRecords(pattern) for pattern in parentPatternList]
+        discoveredPatterns = [PatternToIdRecords(pattern) for pattern in discoveredPatternList]
+        self.write((patternCount, parentPatterns, discoveredPatterns))
+
+    def write(self, levelState):
+        state = (self.parameters, self.iteration, Graph.gLabelAttributes, self.patternRecords, levelState)
+        stateData = zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+        tempFileName = self.fileName + '.tmp'
+        with open(tempFileName, 'wb') as checkpointFile:
+            pickle.dump((CHECKPOINT_VERSION, self.graphData, stateData), checkpointFile, pickle.HIGHEST_PROTOCOL)
+            checkpointFile.flush()
+            os.fsync(checkpointFile.fileno())
+        os.replace(tempFileName, self.fileName)
+
+    def read(self, parameters):
+        """Read the checkpoint file, and return the graph, iteration, patterns of earlier iterations, and the search
+        state (patternCount, parentPatternList, discoveredPatterns) or None if at the start of the iteration. The given
+        parameters are set to those of the checkpointed run, except for those in gRuntimeParameters. The checkpoint
+        file should only be read if it was written by Subdue: it is unpickled."""
+        with open(self.fileName, 'rb') as checkpointFile:
+            version, self.graphData, stateData = pickle.load(checkpointFile)
+        if version != CHECKPOINT_VERSION:
+            raise ValueError("unsupported checkpoint version " + str(version) + " in " + self.fileName)
+        storedParameters, self.iteration, labelAttributes, self.patternRecords, levelState = pickle.loads(zlib.decompress(stateData))
+        for name, value in storedParameters.items():
+            if name not in gRuntimeParameters:
+                setattr(parameters, name, value)
+        self.parameters = dict(vars(parameters))
+        Graph.ResetLabels()
+        for attributes in labelAttributes:
+            Graph.LabelId(attributes)
+        graph = GraphFromRecords(pickle.loads(zlib.decompress(self.graphData)))
+        patterns = [[PatternFromRecords(patternRecord, graph) for patternRecord in patternRecords]
+                    for patternRecords in self.patternRecords]
+        if levelState is not None:
+            patternCount, parentPatterns, discoveredPatterns = levelState
+            parentPatternList = [PatternFromIdRecords(graph, patternRecord) for patternRecord in parentPatterns]
+            discoveredPatterns = [PatternFromIdRecords(graph, patternRecord) for patternRecord in discoveredPatterns]
+            levelState = (patternCount, parentPatternList, discoveredPatterns)
+        return graph, self.iteration, patterns, levelState
+
+# ----- Records
+
+def GraphToRecords(graph):
+    """Return records of the vertices (id, timestamp, temporal, attributes, incident edge IDs) and edges (id, source ID,
+    target ID, directed, timestamp, temporal, attributes) of the given graph, in order."""
+    vertexRecords = [(vertex.id, vertex.timestamp, vertex.temporal, vertex.attributes, [edge.id for edge in vertex.edges])
+                     for vertex in graph.vertices.values()]
+    edgeRecords = [EdgeToRecord(edge) for edge in graph.edges.values()]
+    return (vertexRecords, edgeRecords)
+
+def EdgeToRecord(edge):
+    return (edge.id, edge.source.id, edge.target.id, edge.directed, edge.timestamp, edge.temporal, edge.attributes)
+
+def GraphFromRecords(graphRecords):
+    """Return graph from its records (see GraphToRecords)."""
+    vertexRecords, edgeRecords = graphRecords
+    graph = Graph.Graph()
+    for vertexId, timestamp, temporal, attributes, edgeIds in vertexRecords:
+        vertex = Graph.Vertex(vertexId)
+        vertex.timestamp = timestamp
+        vertex.temporal = temporal
+        vertex.set_attributes(attributes)
+        graph.vertices[vertexId] = vertex
+    for edgeId, sourceId, targetId, directed, timestamp, temporal, attributes in edgeRecords:
+        edge = Graph.Edge(edgeId, graph.vertices[sourceId], graph.vertices[targetId], directed)
+        edge.timestamp = timestamp
+        edge.temporal = temporal
+        edge.set_attributes(attributes)
+        graph.edges[edgeId] = edge
+    # Incident edges are restored in their original order, which determines the order of pattern extension
+    for vertexId, timestamp, temporal, attributes, edgeIds in vertexRecords:
+        vertex = graph.vertices[vertexId]
+        for edgeId in edgeIds:
+            vertex.add_edge(graph.edges[edgeId])
+    return graph
+
+def PatternToRecords(pattern):
+    """Return standalone records of the given pattern: its value, definition, and instances as the IDs of their
+    vertices plus graph records of their edges and endpoints, so that the pattern can be restored after its instances
+    have been compressed out of the graph. Compression may have reconnected an edge of an instance to a vertex outside
+    it, so endpoints are recorded along with the instance's vertices."""
+    instanceRecords = []
+    for instance in pattern.instances:
+        vertices = dict.fromkeys(instance.vertices)
+        for edge in instance.edges:
+            vertices[edge.source] = None
+            vertices[edge.target] = None
+        vertexRecords = [(vertex.id, vertex.timestamp, vertex.temporal, vertex.attributes, []) for vertex in vertices]
+        edgeRecords = [EdgeToRecord(edge) for edge in instance.edges]
+        instanceRecords.append(([vertex.id for vertex in instance.vertices], (vertexRecords, edgeRecords)))
+    return (pattern.value, GraphToRecords(pattern.definition), instanceRecords)
+
+def PatternFromRecords(patternRecords, graph):
+    """Return pattern from its standalone records (see PatternToRecords). Instance edges still in the given graph are
+    taken from it, so that they are reconnected by later compressions, as they would have been without the checkpoint."""
+    value, definitionRecords, instanceRecords = patternRecords
+    instances = []
+    for vertexIds, graphRecords in instanceRecords:
+        instanceGraph = GraphFromRecords(graphRecords)
+        instance = Pattern.InstanceFromIds(instanceGraph, vertexIds, [])
+        for edgeId, edge in instanceGraph.edges.items():
+            instance.edges.add(graph.edges.get(edgeId, edge))
+        instances.append(instance)
+    pattern = Pattern.CreatePatternFromInstances(GraphFromRecords(definitionRecords), instances)
+    pattern.value = value
+    return pattern
+
+def PatternToIdRecords(pattern):
+    """Return records of the given pattern, whose instances are given by the IDs of their vertices and edges in the
+    graph (see Pattern.PatternToIds)."""
+    instanceIds = [Pattern.InstanceToIds(instance) for instance in pattern.instances]
+    return (pattern.value, GraphToRecords(pattern.definition), instanceIds)
+
+def PatternFromIdRecords(graph, patternRecords):
+    value, definitionRecords, instanceIds = patternRecords
+    instances = [Pattern.InstanceFromIds(graph, vertexIds, edgeIds) for vertexIds, edgeIds in instanceIds]
+    pattern = Pattern.CreatePatternFromInstances(GraphFromRecords(definitionRecords), instances)
+    pattern.value = value
+    return pattern
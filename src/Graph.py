@@ -4,7 +4,12 @@
 #
 # Copyright (c) 2017-2021. Washington State University.
 
+import collections
+import gzip
 import json
+import re
+import CanonicalCode
+import Stats
         
 # The Graph class allows the representation of an attributed, mixed multi-graph with time stamps on nodes
 # and edges. A graph has an id and a className (for now, either "positive" or "negative"). Each node has
@@ -16,10 +21,16 @@ class Graph:
     def __init__(self):
         self.vertices = {}
         self.edges = {}
+        self.matchIndex = None # cached by GetMatchIndex
+        self.canonicalCode = None # cached by CanonicalCode.CanonicalCode
+        self.fingerprint = None # cached by GraphFingerprint
+        self.signature = None # cached by GraphSignature
     
     def Compress(self,iteration,pattern):
         """Compress graph using given pattern at given iteration. Replaces each instance of pattern with a new
-           vertex, and reconnects edges incident on the instance to the new vertex. Assumes no overlap among instances."""
+           vertex, and reconnects edges incident on the instance to the new vertex. Assumes no overlap among instances.
+           Returns the list of new vertices."""
+        newVertices = []
         instanceNum = 0
         for instance in pattern.instances:
             instanceNum += 1
@@ -30,78 +41,88 @@ class Graph:
             newVertex.timestamp = instance.max_timestamp()
             newVertex.add_attribute('label', newVertexLabel)
             self.vertices[newVertexId] = newVertex
-            # Remove instance's edges from graph and from source/target vertex edge lists
+            newVertices.append(newVertex)
+            # Remove instance's edges from graph and from source/target vertex edge sets
             for instanceEdge in instance.edges:
-                instanceEdge.source.edges.remove(instanceEdge)
-                instanceEdge.target.edges.remove(instanceEdge)
+                instanceEdge.source.remove_edge(instanceEdge)
+                instanceEdge.target.remove_edge(instanceEdge)
                 del self.edges[instanceEdge.id]
-            # Remove instance's vertices from graph; remaining edges incident on this vertex should be made incident on newVertex
-            for instanceVertex in instance.vertices:
-                for edge in instanceVertex.edges:
-                    if edge.source == instanceVertex:
-                        edge.source = newVertex
-                    if edge.target == instanceVertex:
-                        edge.target = newVertex
-                    if edge not in newVertex.edges:
-                        newVertex.edges.append(edge)
+            # Remove instance's vertices from graph; remaining edges incident on them are collected and then made
+            # incident on newVertex in one pass
+            instanceVertices = instance.vertices
+            for instanceVertex in instanceVertices:
+                newVertex.edges.update(instanceVertex.edges)
                 del self.vertices[instanceVertex.id]
+            for edge in newVertex.edges:
+                if edge.source in instanceVertices:
+                    edge.source = newVertex
+                if edge.target in instanceVertices:
+                    edge.target = newVertex
+        return newVertices
 
     def TemporalOrder(self):
         """Set the temporal property of vertices and edges according to their order of arrival."""
+        self.matchIndex = None
+        self.canonicalCode = None
+        self.fingerprint = None
+        self.signature = None
         # Collect and sort all unique timestamps in graph
-        timestamps = []
+        timestamps = set(vertex.timestamp for vertex in self.vertices.values())
+        timestamps.update(edge.timestamp for edge in self.edges.values())
+        ranks = TemporalRanks(sorted(timestamps))
+        # Set temporal property based on order of timestamp
         for vertex in self.vertices.values():
-            if vertex.timestamp not in timestamps:
-                timestamps.append(vertex.timestamp)
+            vertex.temporal = ranks[vertex.timestamp]
         for edge in self.edges.values():
-            if edge.timestamp not in timestamps:
-                timestamps.append(edge.timestamp)
-        timestamps.sort()
-         # Set temporal property based on order of timestamp
-        for vertex in self.vertices.values():
-            vertex.temporal = timestamps.index(vertex.timestamp)
-        for edge in self.edges.values():
-            edge.temporal = timestamps.index(edge.timestamp)
+            edge.temporal = ranks[edge.timestamp]
 
     # Load graph from given JSON array of vertices and edges.
-    # ***** todo: Read graph from stream, rather than all at once
     def load_from_json (self, jsonGraphArray):
         # Initialize graph (just in case it's being reused)
         self.vertices = {}
         self.edges = {}
         for json_object in jsonGraphArray:
-            if ('vertex' in json_object):
-                vertexDict = json_object['vertex']
-                vertexId = vertexDict['id']
-                if (vertexId not in self.vertices): # in case fused graph with duplicate vertices
-                    vertex = Vertex(vertexId)
-                    if ('timestamp' in vertexDict):
-                        vertex.timestamp = int(vertexDict['timestamp'])
-                    if ('attributes' in vertexDict):
-                        json_attrs = vertexDict['attributes']
-                        for key,value in json_attrs.items():
-                            vertex.add_attribute(key, value)
-                    self.vertices[vertexId] = vertex
-            if ('edge' in json_object):
-                edgeDict = json_object['edge']
-                edgeId = edgeDict['id']
-                sourceId = edgeDict['source']
-                targetId = edgeDict['target']
-                sourceVertex = self.vertices[sourceId]
-                targetVertex = self.vertices[targetId]
-                directed = False
-                if (edgeDict['directed'] == 'true'):
-                    directed = True
-                edge = Edge(edgeId, sourceVertex, targetVertex, directed)
-                if ('timestamp' in edgeDict):
-                    edge.timestamp = int(edgeDict['timestamp'])
-                if ('attributes' in edgeDict):
-                    json_attrs = edgeDict['attributes']
-                    for key,value in json_attrs.items():
-                        edge.add_attribute(key,value)
-                self.edges[edgeId] = edge
-                sourceVertex.add_edge(edge)
-                targetVertex.add_edge(edge)
+            self.add_json_object(json_object)
+
+    def load_from_json_stream(self, inputFile, chunkSize=1048576):
+        """Load graph from given text stream containing a JSON array of vertices and edges. The stream is read in chunks
+        and parsed one vertex or edge at a time, so the whole JSON document is never held in memory."""
+        # Initialize graph (just in case it's being reused)
+        self.vertices = {}
+        self.edges = {}
+        for json_object in ReadJsonArray(inputFile, chunkSize):
+            self.add_json_object(json_object)
+
+    def add_json_object(self, json_object):
+        """Add the vertex or edge in the given JSON object (as parsed from the input graph format) to the graph."""
+        if ('vertex' in json_object):
+            vertexDict = json_object['vertex']
+            vertexId = vertexDict['id']
+            if (vertexId not in self.vertices): # in case fused graph with duplicate vertices
+                vertex = Vertex(vertexId)
+                if ('timestamp' in vertexDict):
+                    vertex.timestamp = int(vertexDict['timestamp'])
+                if ('attributes' in vertexDict):
+                    vertex.set_attributes(vertexDict['attributes'])
+                self.vertices[vertexId] = vertex
+        if ('edge' in json_object):
+            edgeDict = json_object['edge']
+            edgeId = edgeDict['id']
+            sourceId = edgeDict['source']
+            targetId = edgeDict['target']
+            sourceVertex = self.vertices[sourceId]
+            targetVertex = self.vertices[targetId]
+            directed = False
+            if (edgeDict['directed'] == 'true'):
+                directed = True
+            edge = Edge(edgeId, sourceVertex, targetVertex, directed)
+            if ('timestamp' in edgeDict):
+                edge.timestamp = int(edgeDict['timestamp'])
+            if ('attributes' in edgeDict):
+                edge.set_attributes(edgeDict['attributes'])
+            self.edges[edgeId] = edge
+            sourceVertex.add_edge(edge)
+            targetVertex.add_edge(edge)
 
     def load_from_networkx(
         self,
@@ -159,27 +180,12 @@ class Graph:
         outputFile.write('}\n')
         outputFile.close()
     
-    def write_to_file(self, outputFileName):
-        """Write graph to given file name in JSON format."""
-        outputFile = open(outputFileName, 'w')
-        outputFile.write('[\n')
-        firstOne = True
-        for vertex in self.vertices.values():
-            if firstOne:
-                firstOne = False
-            else:
-                outputFile.write(',\n')
-            vertex.write_to_file(outputFile)
-        outputFile.write(',\n')
-        firstOne = True
-        for edge in self.edges.values():
-            if firstOne:
-                firstOne = False
-            else:
-                outputFile.write(',\n')
-            edge.write_to_file(outputFile)
-        outputFile.write('\n]\n')
-        outputFile.close()
+    def write_to_file(self, outputFileName, compress=False):
+        """Write graph to given file name in JSON format, gzip-compressed if compress is True."""
+        writer = GraphWriter(outputFileName, compress)
+        writer.write_vertices(self.vertices.values())
+        writer.write_edges(self.edges.values())
+        writer.close()
     
     def print_graph(self, tab=""):
         print(tab + "Graph:")
@@ -188,20 +194,34 @@ class Graph:
         for edge in self.edges.values():
             edge.print_edge(tab+'  ')
 
+# Vertices and edges use __slots__ to avoid a per-object __dict__, and elements loaded with exactly the same attributes
+# share one attribute dictionary (see SharedAttributes), so that large graphs fit in memory.
 class Vertex:
     
+    __slots__ = ('id', 'timestamp', 'temporal', 'attributes', 'label', 'edges')
+    
     def __init__(self, id):
         self.id = id # must be unique for each vertex
         self.timestamp = 0
         self.temporal = 0 # used to set arrival order of vertex internally for graph matcher
         self.attributes = {}
-        self.edges = []
+        self.label = 0 # integer id of attributes, interned by LabelId; used for matching
+        self.edges = {} # incident edges, as keys of an insertion-ordered dict for constant-time removal
     
     def add_attribute(self, key, value):
-        self.attributes[key] = value
+        attributes = dict(self.attributes) # attribute dictionary may be shared, so never modified in place
+        attributes[key] = value
+        self.set_attributes(attributes)
+    
+    def set_attributes(self, attributes):
+        self.label = LabelId(attributes)
+        self.attributes = SharedAttributes(attributes)
     
     def add_edge(self, edge):
-        self.edges.append(edge)
+        self.edges[edge] = None
+    
+    def remove_edge(self, edge):
+        self.edges.pop(edge, None)
     
     def print_vertex(self, tab=""):
         attributeString = ""
@@ -209,23 +229,19 @@ class Vertex:
             attributeString += ', ' + key + '=' + str(value)
         print(tab + 'vertex "' + self.id + '": timestamp=' + str(self.timestamp) + attributeString)
     
-    def write_to_file(self, outputFile):
-        """Write vertex to given file stream in JSON format"""
-        outputFile.write('  {"vertex": {\n')
-        outputFile.write('     "id": "' + self.id + '",\n')
-        outputFile.write('     "attributes": {')
-        firstOne = True
-        for key,value in self.attributes.items():
-            if firstOne:
-                firstOne = False
-            else:
-                outputFile.write(',')
-            outputFile.write('"' + key + '": "' + value + '"')
-        outputFile.write('},\n')
-        outputFile.write('     "timestamp": "' + str(self.timestamp) + '"}}')
+    def to_json(self, attributesJSON=None):
+        """Return the vertex in JSON format, given the JSON of its attributes if already known (see AttributesJSON)."""
+        if attributesJSON is None:
+            attributesJSON = AttributesJSON(self.attributes)
+        return ('  {"vertex": {\n'
+                '     "id": ' + ValueJSON(self.id) + ',\n'
+                '     "attributes": ' + attributesJSON + ',\n'
+                '     "timestamp": "' + str(self.timestamp) + '"}}')
 
 class Edge:
 
+    __slots__ = ('id', 'source', 'target', 'directed', 'timestamp', 'temporal', 'attributes', 'label')
+
     def __init__(self, id, source, target, directed = False):
         self.id = id # must be unique for each edge
         self.source = source
@@ -234,9 +250,16 @@ class Edge:
         self.timestamp = 0
         self.temporal = 0 # used to set arrival order of edge internally for graph matcher
         self.attributes = {}
+        self.label = 0 # integer id of attributes, interned by LabelId; used for matching
         
     def add_attribute(self, key, value):
-        self.attributes[key] = value
+        attributes = dict(self.attributes) # attribute dictionary may be shared, so never modified in place
+        attributes[key] = value
+        self.set_attributes(attributes)
+    
+    def set_attributes(self, attributes):
+        self.label = LabelId(attributes)
+        self.attributes = SharedAttributes(attributes)
     
     def print_edge(self, tab=""):
         attributeString = ""
@@ -250,26 +273,138 @@ class Edge:
         edgeString += self.target.id
         print(tab + 'edge "' + self.id + '" (' + edgeString + '): timestamp=' + str(self.timestamp) + attributeString)
         
-    def write_to_file(self, outputFile):
-        """Write edge to given file stream in JSON format"""
-        outputFile.write('  {"edge": {\n')
-        outputFile.write('     "id": "' + self.id + '",\n')
-        outputFile.write('     "source": "' + self.source.id + '",\n')
-        outputFile.write('     "target": "' + self.target.id + '",\n')
-        outputFile.write('     "attributes": {')
-        firstOne = True
-        for key,value in self.attributes.items():
-            if firstOne:
-                firstOne = False
-            else:
-                outputFile.write(',')
-            outputFile.write('"' + key + '": "' + value + '"')
-        outputFile.write('},\n')
+    def to_json(self, attributesJSON=None):
+        """Return the edge in JSON format, given the JSON of its attributes if already known (see AttributesJSON)."""
+        if attributesJSON is None:
+            attributesJSON = AttributesJSON(self.attributes)
         if self.directed:
-            outputFile.write('     "directed": "true",\n')
+            directedJSON = '"true"'
         else:
-            outputFile.write('     "directed": "false",\n')
-        outputFile.write('     "timestamp": "' + str(self.timestamp) + '"}}')
+            directedJSON = '"false"'
+        return ('  {"edge": {\n'
+                '     "id": ' + ValueJSON(self.id) + ',\n'
+                '     "source": ' + ValueJSON(self.source.id) + ',\n'
+                '     "target": ' + ValueJSON(self.target.id) + ',\n'
+                '     "attributes": ' + attributesJSON + ',\n'
+                '     "directed": ' + directedJSON + ',\n'
+                '     "timestamp": "' + str(self.timestamp) + '"}}')
+
+
+# ----- JSON output
+
+# Output is built as a list of strings, one per vertex or edge, which is joined and written every gOutputChunkSize
+# elements through a file buffer of gOutputBufferSize bytes, rather than written a few characters at a time.
+gOutputChunkSize = 4096
+gOutputBufferSize = 1048576
+
+def ValueJSON(value):
+    """Return the given ID or attribute value in JSON format. Strings are escaped as needed; values that JSON cannot
+    represent are written as strings."""
+    if type(value) is str:
+        return json.encoder.encode_basestring(value) # same as json.dumps, without its per-call setup
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+def AttributesJSON(attributes):
+    """Return the given attribute dictionary as a JSON object, formatted as {"key1": "value1","key2": "value2"}."""
+    return json.dumps(attributes, ensure_ascii=False, separators=(',', ': '), default=str)
+
+class GraphWriter:
+    """Writes vertices and edges to a file as a JSON array in the input graph format, optionally gzip-compressed.
+    Elements with exactly the same attributes share one dictionary (see SharedAttributes), so the JSON of each shared
+    dictionary is computed once."""
+    
+    def __init__(self, outputFileName, compress=False):
+        if compress:
+            self.outputFile = gzip.open(outputFileName, 'wt', encoding='utf-8', compresslevel=6)
+        else:
+            self.outputFile = open(outputFileName, 'w', encoding='utf-8', buffering=gOutputBufferSize)
+        self.chunk = ['[\n']
+        self.separator = '' # written before each element; ',\n' after the first
+        self.attributesJSON = {} # id of attribute dictionary -> (dictionary, its JSON); the reference keeps the id valid
+    
+    def attributes_json(self, element):
+        entry = self.attributesJSON.get(id(element.attributes))
+        if entry is None:
+            entry = (element.attributes, AttributesJSON(element.attributes))
+            self.attributesJSON[id(element.attributes)] = entry
+        return entry[1]
+    
+    def write_vertices(self, vertices):
+        for vertex in vertices:
+            self.write_element(vertex.to_json(self.attributes_json(vertex)))
+    
+    def write_edges(self, edges):
+        for edge in edges:
+            self.write_element(edge.to_json(self.attributes_json(edge)))
+    
+    def write_element(self, elementJSON):
+        self.chunk.append(self.separator)
+        self.chunk.append(elementJSON)
+        self.separator = ',\n'
+        if len(self.chunk) >= (2 * gOutputChunkSize):
+            self.outputFile.write(''.join(self.chunk))
+            self.chunk = []
+    
+    def close(self):
+        self.chunk.append('\n]\n')
+        self.outputFile.write(''.join(self.chunk))
+        self.chunk = []
+        self.outputFile.close()
+
+
+# ----- Streaming JSON input
+
+gWhitespace = re.compile(r'[ \t\n\r]*')
+
+def ReadJsonArray(inputFile, chunkSize=1048576):
+    """Generate the elements of the JSON array in the given text stream one at a time. The stream is read in chunks of
+    the given size, and only the unparsed remainder of the current chunk is kept between elements."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    endOfFile = False
+    expected = '['
+    while True:
+        position = gWhitespace.match(buffer, position).end()
+        if (position == len(buffer)) and (not endOfFile):
+            # Nothing left to parse in buffer, so read the next chunk
+            buffer = inputFile.read(chunkSize)
+            position = 0
+            endOfFile = (not buffer)
+            continue
+        if expected == 'value':
+            try:
+                json_object, endPosition = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if endOfFile:
+                    raise
+                endPosition = len(buffer)
+            if (endPosition == len(buffer)) and (not endOfFile):
+                # Element may continue in next chunk, so read it and parse again
+                chunk = inputFile.read(chunkSize)
+                buffer = buffer[position:] + chunk
+                position = 0
+                endOfFile = (not chunk)
+                continue
+            yield json_object
+            position = endPosition
+            expected = ','
+            continue
+        if endOfFile:
+            raise json.JSONDecodeError("Unexpected end of JSON array", buffer, position)
+        character = buffer[position]
+        position += 1
+        if (expected == '[') and (character == '['):
+            expected = 'first'
+        elif (expected in ['first', ',']) and (character == ']'):
+            return
+        elif (expected == ',') and (character == ','):
+            expected = 'value'
+        elif expected == 'first':
+            position -= 1
+            expected = 'value'
+        else:
+            raise json.JSONDecodeError("Expecting '" + expected + "'", buffer, position - 1)
 
 
 # ----- Graph matcher
@@ -278,7 +413,38 @@ class Edge:
 
 gMaxMappings = 1 # Will be set to E^2 for each match
 
+# Graph matcher used by GraphMatch (see --matcher): the approximate matcher below, unless gMatcher is set to
+# "exact" (GraphMatch_Orig), "vf2" (GraphMatch_VF2) or "canonical" (equal canonical codes).
+gMatcher = "approximate"
+
 def GraphMatch(graph1, graph2):
+    """Returns True if given graphs are isomorphic, using the matcher selected by gMatcher.
+    If the match cache is enabled, repeated matches of the same pair of graph structures are served from it. Cache hits
+    and misses are counted in the run statistics, so that those of worker processes are included."""
+    Stats.gStats.count('graphMatches')
+    if gMatchCache.maxSize > 0:
+        key = (gMatcher, GraphFingerprint(graph1), GraphFingerprint(graph2))
+        matchFound = gMatchCache.get(key)
+        if matchFound is None:
+            Stats.gStats.count('matchCacheMisses')
+            matchFound = MatchGraphs(graph1, graph2)
+            gMatchCache.put(key, matchFound)
+        else:
+            Stats.gStats.count('matchCacheHits')
+        return matchFound
+    return MatchGraphs(graph1, graph2)
+
+def MatchGraphs(graph1, graph2):
+    """Returns True if given graphs are isomorphic, using the matcher selected by gMatcher."""
+    if gMatcher == "vf2":
+        return GraphMatch_VF2(graph1, graph2)
+    if gMatcher == "exact":
+        return GraphMatch_Orig(graph1, graph2)
+    if gMatcher == "canonical":
+        return (CanonicalCode.CanonicalCode(graph1) == CanonicalCode.CanonicalCode(graph2))
+    return GraphMatch_Approximate(graph1, graph2)
+
+def GraphMatch_Approximate(graph1, graph2):
     """Returns True if given graphs are isomorphic.
     This is a poly-time, approximate version of graph isomorphism."""
     global gMaxMappings
@@ -292,6 +458,9 @@ def GraphMatch(graph1, graph2):
         return MatchVertex(graph1, graph2, v1keys[0], v2keys[0])
     gMaxMappings = len(graph1.edges) ** 2 # Limit search to E^2 mappings
     matchFound, numMappings = ExtendMapping(graph1, graph2)
+    Stats.gStats.count('graphMatchMappings', numMappings)
+    if ((not matchFound) and (numMappings > gMaxMappings)):
+        Stats.gStats.count('graphMatchMappingLimitHits') # no match found within the limit, so possibly wrong
     return matchFound
 
 def ExtendMapping(graph1, graph2, mapping=None, numMappings=0):
@@ -365,7 +534,7 @@ def MatchEdge(graph1, graph2, edgeId1, edgeId2, mapping):
     i.e., have same attributes, direction, temporal ordering, and source/target vertices."""
     edge1 = graph1.edges[edgeId1]
     edge2 = graph2.edges[edgeId2]
-    if not (edge1.attributes == edge2.attributes):
+    if (edge1.label != edge2.label):
         return False
     if (edge1.directed != edge2.directed):
         return False
@@ -386,7 +555,7 @@ def MatchVertex(graph1, graph2, vertexId1, vertexId2):
     # First check for same attributes
     vertex1 = graph1.vertices[vertexId1]
     vertex2 = graph2.vertices[vertexId2]
-    if not (vertex1.attributes == vertex2.attributes):
+    if (vertex1.label != vertex2.label):
         return False
     if (len(vertex1.edges) != len(vertex2.edges)):
         return False
@@ -396,6 +565,272 @@ def MatchVertex(graph1, graph2, vertexId1, vertexId2):
     return True
 
 
+# ----- Graph match cache
+
+class MatchCache:
+    """Size-bounded cache of graph match results, discarding the least recently used result when full. A maxSize of 0
+    disables the cache. Counts hits and misses."""
+    
+    def __init__(self, maxSize=0):
+        self.maxSize = maxSize
+        self.results = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Returns the cached result for the given key, or None if not cached."""
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return result
+    
+    def put(self, key, result):
+        self.results[key] = result
+        if len(self.results) > self.maxSize:
+            self.results.popitem(last=False)
+    
+    def clear(self):
+        """Remove all cached results, e.g., after compression changes the graph's labels. Counters are kept."""
+        self.results.clear()
+
+gMatchCache = MatchCache() # Disabled unless enabled by --matchcache
+
+def GraphFingerprint(graph):
+    """Returns a hashable description of the given graph's exact structure, caching it on the graph: the label,
+    temporal order and degree of each vertex, and the endpoint positions, label, direction and temporal order of each
+    edge, in the graph's own order. Graphs with equal fingerprints are identical up to vertex and edge IDs, so any
+    matcher gives the same result for them."""
+    if graph.fingerprint is None:
+        positions = {}
+        vertexPrint = []
+        for vertex in graph.vertices.values():
+            positions[vertex] = len(positions)
+            vertexPrint.append((vertex.label, vertex.temporal, len(vertex.edges)))
+        edgePrint = tuple((positions[edge.source], positions[edge.target], edge.label, edge.directed, edge.temporal)
+                          for edge in graph.edges.values())
+        graph.fingerprint = (tuple(vertexPrint), edgePrint)
+    return graph.fingerprint
+
+
+# ----- VF2-style graph matcher
+
+# An exact matcher that maps vertices, rather than edges. Each graph is indexed once (see MatchIndex): its vertices
+# are colored by label, temporal order and degree, refined by the neighbors and connecting edges, and a connectivity
+# order for mapping its vertices is chosen. Matching then maps the vertices of graph1 in order to
+# same-colored vertices of graph2, checking the edges to the vertices already mapped, and using a reverse mapping to
+# find mapped vertices of graph2 in constant time. Most graphs matched during the search are small instance graphs
+# that are matched only a few times, for which building the index costs more than it saves, so these are matched by
+# an edge-mapping search instead (see GraphMatch_Small), which also maps vertices and so is also exact.
+
+gSmallGraphEdges = 10 # graphs with at most this many edges are matched by GraphMatch_Small, without an index
+
+def GraphMatch_VF2(graph1, graph2):
+    """Returns True if given graphs are isomorphic.
+    This is a correct, non-approximate version of graph isomorphism, with refinement-based candidate pruning.
+    Graphs with at most gSmallGraphEdges edges are matched by GraphMatch_Small."""
+    if (len(graph1.vertices) != len(graph2.vertices)):
+        return False
+    if (len(graph1.edges) != len(graph2.edges)):
+        return False
+    if (len(graph1.edges) <= gSmallGraphEdges):
+        return GraphMatch_Small(graph1, graph2)
+    index1 = GetMatchIndex(graph1)
+    index2 = GetMatchIndex(graph2)
+    if (index1.colorList != index2.colorList):
+        return False
+    if index1.order is None:
+        index1.match_order()
+    return ExtendVertexMapping(index1, index2, {}, {})
+
+def GraphMatch_Small(graph1, graph2):
+    """Returns True if given graphs, with the same numbers of vertices and edges, are isomorphic. Each edge of graph1
+    in turn is mapped to an unused, matching edge of graph2 whose endpoints map consistently with the vertices mapped
+    so far. Needs no index, so it is faster than vertex mapping for small graphs."""
+    if (len(graph1.edges) == 0):
+        v1keys = list(graph1.vertices.keys())
+        v2keys = list(graph2.vertices.keys())
+        return MatchVertex(graph1, graph2, v1keys[0], v2keys[0])
+    mapping = {}
+    if not ExtendEdgeMapping(list(graph1.edges.values()), list(graph2.edges.values()), [], mapping, {}):
+        return False
+    if (len(mapping) < len(graph1.vertices)):
+        # vertices without edges are not mapped by the search, so they are compared separately
+        isolated1 = sorted((vertex.label, vertex.temporal) for vertex in graph1.vertices.values() if not vertex.edges)
+        isolated2 = sorted((vertex.label, vertex.temporal) for vertex in graph2.vertices.values() if not vertex.edges)
+        return (isolated1 == isolated2)
+    return True
+
+def ExtendEdgeMapping(edges1, edges2, mappedEdges2, mapping, reverseMapping):
+    """Map the next edge of edges1 to each feasible edge of edges2 in turn, given the list of edges of edges2 mapped
+    so far and the vertex mapping of their endpoints. An edge is feasible if it is unused, has the same label,
+    direction and temporal order, and its endpoints either are the images of the edge's endpoints or are unmapped and
+    match them (same label, degree and temporal order). Return True if this leads to a complete mapping, else False."""
+    if (len(mappedEdges2) == len(edges1)):
+        return True
+    edge1 = edges1[len(mappedEdges2)]
+    source1 = edge1.source
+    target1 = edge1.target
+    sourceImage = mapping.get(source1)
+    targetImage = mapping.get(target1)
+    for edge2 in edges2:
+        if ((edge1.label != edge2.label) or (edge1.directed != edge2.directed) or (edge1.temporal != edge2.temporal) or
+            (edge2 in mappedEdges2)):
+            continue
+        source2 = edge2.source
+        target2 = edge2.target
+        for reverse in (False, True):
+            if reverse:
+                if edge1.directed:
+                    break # endpoints of directed edges are ordered
+                source2, target2 = target2, source2
+            newSource = (sourceImage is None)
+            if newSource:
+                if ((source2 in reverseMapping) or (source1.label != source2.label) or
+                    (len(source1.edges) != len(source2.edges)) or (source1.temporal != source2.temporal)):
+                    continue
+            elif (sourceImage is not source2):
+                continue
+            newTarget = ((targetImage is None) and (target1 is not source1))
+            if newTarget:
+                if ((target2 in reverseMapping) or (target2 is source2) or (target1.label != target2.label) or
+                    (len(target1.edges) != len(target2.edges)) or (target1.temporal != target2.temporal)):
+                    continue
+            elif (mapping.get(target1, source2) is not target2):
+                continue # target1 is mapped, or is source1 and so mapped to source2
+            if newSource:
+                mapping[source1] = source2
+                reverseMapping[source2] = source1
+            if newTarget:
+                mapping[target1] = target2
+                reverseMapping[target2] = target1
+            mappedEdges2.append(edge2)
+            if ExtendEdgeMapping(edges1, edges2, mappedEdges2, mapping, reverseMapping):
+                return True
+            mappedEdges2.pop()
+            if newSource:
+                del mapping[source1]
+                del reverseMapping[source2]
+            if newTarget:
+                del mapping[target1]
+                del reverseMapping[target2]
+    return False
+
+def GetMatchIndex(graph):
+    """Returns the MatchIndex of the given graph, creating and caching it on the graph if needed."""
+    if graph.matchIndex is None:
+        graph.matchIndex = MatchIndex(graph)
+    return graph.matchIndex
+
+class MatchIndex:
+    """Index of a graph used by GraphMatch_VF2. A vertex is described by its label, temporal order and degree. The
+    edges between a vertex and each neighbor (possibly itself) are a sorted tuple of (label, temporal, direction)
+    triples, where direction is 0 if undirected, 1 if out of the vertex, 2 if into the vertex, and 3 if a directed
+    self-loop. A vertex's color hashes its descriptor and its neighbors' descriptors and connecting edges (one round
+    of refinement, so isomorphic graphs get the same colors). Colors only prune candidates; descriptors and edges
+    are always compared as well."""
+    
+    def __init__(self, graph):
+        self.descriptors = {}
+        self.neighbors = {}
+        for vertex in graph.vertices.values():
+            self.descriptors[vertex] = (vertex.label, vertex.temporal, len(vertex.edges))
+            self.neighbors[vertex] = {}
+        for edge in graph.edges.values():
+            source = edge.source
+            target = edge.target
+            if source is target:
+                edgePairs = ((source, target, 3 if edge.directed else 0),)
+            elif edge.directed:
+                edgePairs = ((source, target, 1), (target, source, 2))
+            else:
+                edgePairs = ((source, target, 0), (target, source, 0))
+            for vertex, neighbor, direction in edgePairs:
+                neighborEdges = self.neighbors[vertex]
+                edgeDescriptor = (edge.label, edge.temporal, direction)
+                if neighbor in neighborEdges:
+                    neighborEdges[neighbor] = tuple(sorted(neighborEdges[neighbor] + (edgeDescriptor,)))
+                else:
+                    neighborEdges[neighbor] = (edgeDescriptor,)
+        self.colors = {}
+        self.verticesByColor = {}
+        for vertex, neighborEdges in self.neighbors.items():
+            neighborColors = sorted((self.descriptors[neighbor], edges) for neighbor, edges in neighborEdges.items())
+            color = hash((self.descriptors[vertex], tuple(neighborColors)))
+            self.colors[vertex] = color
+            if color not in self.verticesByColor:
+                self.verticesByColor[color] = []
+            self.verticesByColor[color].append(vertex)
+        self.colorList = sorted(self.colors.values())
+        self.order = None # computed by match_order, only needed when the graph is graph1
+        self.parents = None
+    
+    def match_order(self):
+        """Sets the order in which to map the vertices of the graph, and for each vertex a previously ordered
+        neighbor (or None). Each next vertex is the one with most already-ordered neighbors, ties broken by the
+        rarest color."""
+        self.order = []
+        self.parents = {}
+        orderedNeighborCounts = {vertex: 0 for vertex in self.neighbors}
+        while orderedNeighborCounts:
+            vertex = max(orderedNeighborCounts, key = lambda v: (orderedNeighborCounts[v], -len(self.verticesByColor[self.colors[v]])))
+            del orderedNeighborCounts[vertex]
+            self.parents[vertex] = None
+            for neighbor in self.neighbors[vertex]:
+                if (neighbor in self.parents) and (neighbor is not vertex) and (self.parents[vertex] is None):
+                    self.parents[vertex] = neighbor
+                if neighbor in orderedNeighborCounts:
+                    orderedNeighborCounts[neighbor] += 1
+            self.order.append(vertex)
+
+def ExtendVertexMapping(index1, index2, mapping, reverseMapping):
+    """Map the next vertex of graph1 in its match order to each feasible vertex of graph2 in turn.
+    Return True if this leads to a complete mapping, else False."""
+    if (len(mapping) == len(index1.order)):
+        return True
+    vertex1 = index1.order[len(mapping)]
+    color = index1.colors[vertex1]
+    parent1 = index1.parents[vertex1]
+    if parent1 is None:
+        candidates = index2.verticesByColor.get(color, [])
+    else:
+        candidates = index2.neighbors[mapping[parent1]] # vertex1 must map to a neighbor of its parent's image
+    for vertex2 in candidates:
+        if (vertex2 in reverseMapping) or (index2.colors[vertex2] != color):
+            continue
+        if FeasibleVertexPair(index1, index2, vertex1, vertex2, mapping, reverseMapping):
+            mapping[vertex1] = vertex2
+            reverseMapping[vertex2] = vertex1
+            if ExtendVertexMapping(index1, index2, mapping, reverseMapping):
+                return True
+            del mapping[vertex1]
+            del reverseMapping[vertex2]
+    return False
+
+def FeasibleVertexPair(index1, index2, vertex1, vertex2, mapping, reverseMapping):
+    """Return True if vertex1 can be mapped to vertex2 given the current mapping; i.e., same descriptor and self-loops,
+    and the same edges to each mapped neighbor, with no other mapped neighbors of vertex2."""
+    if (index1.descriptors[vertex1] != index2.descriptors[vertex2]):
+        return False
+    neighborEdges1 = index1.neighbors[vertex1]
+    neighborEdges2 = index2.neighbors[vertex2]
+    if (neighborEdges1.get(vertex1) != neighborEdges2.get(vertex2)):
+        return False
+    numMappedNeighbors = 0
+    for neighbor1, edges1 in neighborEdges1.items():
+        neighbor2 = mapping.get(neighbor1)
+        if (neighbor2 is not None):
+            if (neighborEdges2.get(neighbor2) != edges1):
+                return False
+            numMappedNeighbors += 1
+    for neighbor2 in neighborEdges2:
+        if (neighbor2 in reverseMapping):
+            numMappedNeighbors -= 1
+    return (numMappedNeighbors == 0)
+
+
 # ----- Graph Creation
 
 def CreateGraphFromEdge(edge):
@@ -405,43 +840,180 @@ def CreateGraphFromEdge(edge):
     g.vertices["1"] = source
     source.timestamp = edge.source.timestamp
     source.attributes = edge.source.attributes
+    source.label = edge.source.label
     target = Vertex("2")
     g.vertices["2"] = target
     target.timestamp = edge.target.timestamp
     target.attributes = edge.target.attributes
+    target.label = edge.target.label
     e = Edge("1", source, target, edge.directed)
     g.edges["1"] = e
     e.timestamp = edge.timestamp
     e.attributes = edge.attributes
-    source.edges.append(e)
-    target.edges.append(e)
+    e.label = edge.label
+    source.add_edge(e)
+    target.add_edge(e)
     return g
 
-def CreateGraphFromInstance(instance):
-    """Create graph with same properties and isomorphic to given instance, but with new vertex/edge IDs."""
+def CreateGraphFromInstance(instance, temporal=False):
+    """Create graph with same properties and isomorphic to given instance, but with new vertex/edge IDs. If temporal=True,
+    the temporal order of the graph is set from the instance's timestamps, as by TemporalOrder."""
     g = Graph()
+    if temporal:
+        ranks = TemporalRanks(instance.timestamps())
     # Add vertices
     vertexId = 1
     vertexMapping = {}
-    for vertex in instance.vertices:
+    for vertex in instance.iter_vertices():
         newVertex = Vertex(str(vertexId))
         newVertex.timestamp = vertex.timestamp
         newVertex.attributes = vertex.attributes
+        newVertex.label = vertex.label
+        if temporal:
+            newVertex.temporal = ranks[vertex.timestamp]
         g.vertices[newVertex.id] = newVertex
         vertexMapping[vertex.id] = newVertex
         vertexId += 1
     # Add edges
     edgeId = 1
-    for edge in instance.edges:
+    for edge in instance.iter_edges():
         source = vertexMapping[edge.source.id]
         target = vertexMapping[edge.target.id]
         newEdge = Edge(str(edgeId), source, target, edge.directed)
         newEdge.timestamp = edge.timestamp
         newEdge.attributes = edge.attributes
+        newEdge.label = edge.label
+        if temporal:
+            newEdge.temporal = ranks[edge.timestamp]
         g.edges[newEdge.id] = newEdge
-        source.edges.append(newEdge)
-        target.edges.append(newEdge)
+        source.add_edge(newEdge)
+        target.add_edge(newEdge)
         edgeId += 1
     return g
 
-    
+def TemporalRanks(timestamps):
+    """Returns dictionary mapping each of the given sorted, distinct timestamps to its position."""
+    return {timestamp: rank for rank, timestamp in enumerate(timestamps)}
+
+
+# ----- Labels and Graph Signatures
+
+# Each distinct attribute dictionary is interned as a small integer label id, so that vertices and edges are matched
+# and hashed by comparing integers. Label id 0 is always the empty attribute dictionary. The table is reset by
+# ResetLabels before each graph is loaded for a run (see Subdue.ReadGraph and Subdue.nx_subdue), so it only holds the
+# labels of the graph being mined and its patterns.
+#
+# Equal attribute dictionaries get the same label even if their values differ in type (e.g., 1 and True), but each
+# element keeps attributes exactly as given for output. Only dictionaries with the same keys and the same values of
+# the same types, in the same order, share one dictionary object (see SharedAttributes).
+gLabelIds = {frozenset(): 0}
+gLabelAttributes = [{}]
+gSharedAttributes = {} # exact key (see ExactAttributesKey) -> attribute dictionary shared by elements
+
+def ResetLabels():
+    """Empty the label table, except for label id 0, and the shared attribute dictionaries. Label ids of graphs created
+    before are no longer valid, so such graphs must not be mined or compared with graphs created after."""
+    global gLabelIds, gLabelAttributes, gSharedAttributes
+    gLabelIds = {frozenset(): 0}
+    gLabelAttributes = [{}]
+    gSharedAttributes = {}
+
+def AttributesKey(attributes):
+    """Return a hashable key for the given attribute dictionary, such that two dictionaries have the same key
+    if and only if they are equal. Unhashable attribute values are keyed by their type and repr (see ValueKey)."""
+    try:
+        return frozenset(attributes.items())
+    except TypeError:
+        return frozenset((key, ValueKey(value)) for key,value in attributes.items())
+
+def ValueKey(value):
+    """Return the given attribute value if hashable, or else a tagged tuple of its type and repr, which cannot equal
+    a string or other hashable attribute value."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ('unhashable', type(value).__qualname__, repr(value))
+
+def LabelId(attributes):
+    """Return the integer label id of the given attribute dictionary, interning it if not seen before. A copy of the
+    first dictionary seen for each label is kept in gLabelAttributes."""
+    key = AttributesKey(attributes)
+    labelId = gLabelIds.get(key)
+    if labelId is None:
+        labelId = len(gLabelAttributes)
+        gLabelIds[key] = labelId
+        gLabelAttributes.append(dict(attributes))
+    return labelId
+
+gExactValueTypes = (int, float, bool, type(None)) # keyed by type and repr, since e.g. 1 == 1.0 == True and 0.0 == -0.0
+
+def ExactAttributesKey(attributes):
+    """Return a hashable key for the given attribute dictionary, such that two dictionaries have the same key only if
+    they have the same string keys in the same order, and the same values of the same types. Returns None if a key is
+    not a string or a value is not a string, number, boolean or None."""
+    key = []
+    for name, value in attributes.items():
+        if type(name) is not str:
+            return None
+        valueType = type(value)
+        if valueType is str:
+            key.append((name, value))
+        elif valueType in gExactValueTypes:
+            key.append((name, valueType, repr(value)))
+        else:
+            return None
+    return tuple(key)
+
+def SharedAttributes(attributes):
+    """Return a copy of the given attribute dictionary, which is shared with other elements whose attributes are
+    exactly the same (see ExactAttributesKey). The shared dictionary must never be modified in place."""
+    key = ExactAttributesKey(attributes)
+    if key is None:
+        return dict(attributes)
+    sharedAttributes = gSharedAttributes.get(key)
+    if sharedAttributes is None:
+        sharedAttributes = dict(attributes)
+        gSharedAttributes[key] = sharedAttributes
+    return sharedAttributes
+
+def EdgeSignature(edge, temporal=False):
+    """Return a hashable signature of the one-edge graph created from the given edge. Two edges have the same signature
+    if and only if their one-edge graphs match; i.e., same source, edge and target labels, direction and, if temporal,
+    the same arrival order of the two vertices and the edge. Endpoints of undirected edges are unordered."""
+    sourceTemporal = targetTemporal = edgeTemporal = 0
+    if temporal:
+        timestamps = sorted({edge.source.timestamp, edge.target.timestamp, edge.timestamp})
+        sourceTemporal = timestamps.index(edge.source.timestamp)
+        targetTemporal = timestamps.index(edge.target.timestamp)
+        edgeTemporal = timestamps.index(edge.timestamp)
+    source = (edge.source.label, sourceTemporal)
+    target = (edge.target.label, targetTemporal)
+    if edge.directed:
+        endpoints = (source, target)
+    else:
+        endpoints = frozenset((source, target))
+    return (edge.label, edge.directed, edgeTemporal, endpoints)
+
+def GraphSignature(graph):
+    """Return a hashable, isomorphism-invariant signature of the given graph: the number of vertices plus the multiset of
+    edge descriptors, where each edge is described by its label, direction and temporal order, and by the label,
+    degree and temporal order of its endpoints. Graphs that match under GraphMatch always have the same signature, so
+    only graphs with equal signatures need to be compared. With the canonical matcher, the signature is the graph's
+    canonical code, so graphs match if and only if their signatures are equal. Cached on the graph."""
+    if gMatcher == "canonical":
+        return CanonicalCode.CanonicalCode(graph)
+    if graph.signature is not None:
+        return graph.signature
+    edgeDescriptors = {}
+    for edge in graph.edges.values():
+        source = (edge.source.label, len(edge.source.edges), edge.source.temporal)
+        target = (edge.target.label, len(edge.target.edges), edge.target.temporal)
+        if edge.directed:
+            endpoints = (source, target)
+        else:
+            endpoints = frozenset((source, target))
+        edgeDescriptor = (edge.label, edge.directed, edge.temporal, endpoints)
+        edgeDescriptors[edgeDescriptor] = edgeDescriptors.get(edgeDescriptor, 0) + 1
+    graph.signature = (len(graph.vertices), frozenset(edgeDescriptors.items()))
+    return graph.signature
@@ -4,81 +4,68 @@
 #
 # Copyright (c) 2017-2021. Washington State University.
 #
-# This implementation of OrderedSet maintains the set as both an
-# actual (unordered) Python set and an ordered list. The main
-# difference from other OrderedSet containers is that equality
-# is supported.
+# This implementation of OrderedSet maintains the set as the keys of
+# an insertion-ordered Python dict, which serves as both the set and
+# the ordered list. The main difference from other OrderedSet containers
+# is that equality (and hashing) is supported, based on the elements
+# regardless of their order.
 
 class OrderedSet:
 
+    __slots__ = ('container',)
+
     def __init__(self, arg = None):
         if arg is None:
-            arg = []
-        self.list_container = []
-        self.set_container = set()
-        elements = []
-        if isinstance(arg, (list, set)):
-            elements = arg
-        if isinstance(arg, OrderedSet):
-            elements = arg.list_container
-        for x in elements:
-            self.add(x)
-    
+            self.container = {}
+        elif isinstance(arg, OrderedSet):
+            self.container = arg.container.copy()
+        else:
+            self.container = dict.fromkeys(arg)
+
     def __str__(self):
-        s = '{'
-        firstOne = True
-        for x in self.list_container:
-            if firstOne:
-                firstOne = False
-            else:
-                s += ', '
-            s += str(x)
-        s += '}'
-        return s
-        
+        return '{' + ', '.join(str(x) for x in self.container) + '}'
+
     def __iter__(self):
-        self.list_index = 0
-        return self
-    
-    def __next__(self):
-        if self.list_index >= len(self.list_container):
-            raise StopIteration
-        x = self.list_container[self.list_index]
-        self.list_index += 1
-        return x
-    
+        # Each call returns a new iterator, so nested and concurrent iteration is safe
+        return iter(self.container)
+
+    def __len__(self):
+        return len(self.container)
+
+    def __contains__(self, x):
+        return (x in self.container)
+
     def __sub__(self, other):
-        diff_set = self.set_container - other.set_container
-        elements = [x for x in self.list_container if x in diff_set]
-        return OrderedSet(elements)
-    
+        other_container = other.container
+        return OrderedSet([x for x in self.container if x not in other_container])
+
     def __add__(self, other):
-        new_set = OrderedSet(self.list_container)
-        diff_set = other.set_container - self.set_container
-        other_elements = [x for x in other.list_container if x in diff_set]
-        for x in other_elements:
-            new_set.add(x)
+        new_set = self.copy()
+        new_set.container.update(dict.fromkeys(other.container))
         return new_set
-    
+
     def __eq__(self, other):
-        return (self.set_container == other.set_container)
-    
+        return (self.container.keys() == other.container.keys())
+
     def __ne__(self, other):
-        return (self.set_container != other.set_container)
-    
+        return (self.container.keys() != other.container.keys())
+
+    def __hash__(self):
+        # Consistent with equality; an OrderedSet should not be changed while used as a key
+        return hash(frozenset(self.container))
+
+    def copy(self):
+        return OrderedSet(self)
+
     def add(self, x):
-        if x not in self.set_container:
-            self.list_container.append(x)
-            self.set_container.add(x)
-    
+        self.container[x] = None
+
+    def discard(self, x):
+        self.container.pop(x, None)
+
     def intersect(self, other):
-        if self.set_container.intersection(other.set_container):
-            return True
-        else:
-            return False
-    
+        return (not self.container.keys().isdisjoint(other.container.keys()))
+
     def intersection(self, other):
-        int_set = self.set_container.intersection(other.set_container)
-        elements = [x for x in self.list_container if x in int_set]
-        return OrderedSet(elements)
-    
+        other_container = other.container
+        return OrderedSet([x for x in self.container if x in other_container])
@@ -24,7 +24,18 @@ class Parameters:
         self.writeCompressed = False  # Write compressed graph after iteration i to file outputFileName-compressed-i.json
         self.writePattern = False     # Write best pattern at iteration i to file outputFileName-pattern-i.json
         self.writeInstances = False   # Write instances of best pattern at iteration i as one graph to file outputFileName-instances-i.json
+        self.gzipOutput = False       # Write the above files gzip-compressed, with .gz appended to their names
         self.temporal = False         # Discover static (False) or temporal (True) patterns
+        self.workers = 1              # Number of worker processes used to extend the patterns in the beam.
+        self.matcher = "approximate"  # Graph matcher (approximate, exact, vf2, canonical)
+        self.matchCacheSize = 0       # Maximum number of graph match results to cache; default (0) is no cache.
+        self.bound = False            # Skip extending patterns whose extensions cannot get on the beam, by an upper bound on their value.
+        self.incremental = False      # Keep initial patterns across iterations, collecting again only those changed by compression.
+        self.timeBudget = 0           # Seconds after which the search stops and returns the best patterns so far; default (0) is no limit.
+        self.memoryBudget = 0         # Peak memory (MB) at which the search stops and returns the best patterns so far; default (0) is no limit.
+        self.checkpointFileName = ""  # File to which the state of the run is saved at each iteration and search level; default ("") is none.
+        self.resume = False           # Resume the run from the checkpoint file, if it exists.
+        self.statsFileName = ""       # File to which statistics of the run are written in JSON format; default ("") is none.
     
     def set_parameters (self, args):
         """Set parameters according to given command-line args list."""
@@ -71,8 +82,39 @@ class Parameters:
                 self.writePattern = True
             if optionName == "--writeinstances":
                 self.writeInstances = True
+            if optionName == "--gzip":
+                self.gzipOutput = True
             if optionName == "--temporal":
                 self.temporal = True
+            if optionName == "--workers":
+                index += 1
+                self.workers = int(args[index])
+            if optionName == "--matcher":
+                index += 1
+                matcher_type = args[index]
+                if matcher_type in ["approximate", "exact", "vf2", "canonical"]:
+                    self.matcher = matcher_type
+            if optionName == "--matchcache":
+                index += 1
+                self.matchCacheSize = int(args[index])
+            if optionName == "--bound":
+                self.bound = True
+            if optionName == "--incremental":
+                self.incremental = True
+            if optionName == "--time-budget":
+                index += 1
+                self.timeBudget = float(args[index])
+            if optionName == "--memory-budget":
+                index += 1
+                self.memoryBudget = float(args[index])
+            if optionName == "--checkpoint":
+                index += 1
+                self.checkpointFileName = args[index]
+            if optionName == "--resume":
+                self.resume = True
+            if optionName == "--stats":
+                index += 1
+                self.statsFileName = args[index]
             index += 1
     
     def print(self):
@@ -91,7 +133,18 @@ class Parameters:
         print("  Write Compressed: " + str(self.writeCompressed))
         print("  Write Pattern: " + str(self.writePattern))
         print("  Write Instances: " + str(self.writeInstances))
-        print("  Temporal: " + str(self.temporal) + "\n")
+        print("  Gzip Output: " + str(self.gzipOutput))
+        print("  Temporal: " + str(self.temporal))
+        print("  Workers: " + str(self.workers))
+        print("  Matcher: " + self.matcher)
+        print("  Match Cache Size: " + str(self.matchCacheSize))
+        print("  Bound: " + str(self.bound))
+        print("  Incremental: " + str(self.incremental))
+        print("  Time Budget: " + str(self.timeBudget))
+        print("  Memory Budget: " + str(self.memoryBudget))
+        print("  Checkpoint File Name: " + self.checkpointFileName)
+        print("  Resume: " + str(self.resume))
+        print("  Stats File Name: " + self.statsFileName + "\n")
         
     def set_defaults_for_graph(self, graph):
         if (self.limit == 0):
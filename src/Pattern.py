@@ -4,8 +4,11 @@
 #
 # Copyright (c) 2017-2021. Washington State University.
 
+import bisect
+import itertools
 from OrderedSet import OrderedSet # specialized Subdue version
 import Graph
+import Stats
 
 class Pattern:
     
@@ -19,6 +22,26 @@ class Pattern:
         # (instances-1) because we would also need to retain the definition of the pattern for compression
         self.value = float(((len(self.instances) - 1) * len(self.definition.edges)) / float(len(graph.edges))) 
     
+    def value_bound(self, graph, overlap, minSize, maxSize):
+        """Returns an upper bound on the value of any extension of this pattern with minSize to maxSize edges. Unless
+        instances can overlap on edges, the instances of an extension contain distinct instances of this pattern and have
+        no edges in common, so an extension of size s has at most min(#instances, |E|/s) instances."""
+        if overlap == "edge":
+            return float("inf")
+        numEdges = len(graph.edges)
+        numInstances = len(self.instances)
+        bestProduct = 0 # of (#instances - 1) and size
+        # Up to size |E|/#instances, the product grows with size
+        size = min(numEdges // numInstances, maxSize)
+        if size >= minSize:
+            bestProduct = (numInstances - 1) * size
+        # Beyond, the product is at most |E| - size
+        size = max(size + 1, minSize)
+        while (size <= maxSize) and (numEdges - size > bestProduct):
+            bestProduct = max(bestProduct, ((numEdges // size) - 1) * size)
+            size += 1
+        return float(bestProduct) / float(numEdges)
+    
     def print_pattern(self, tab):
         print(tab + "Pattern (value=" + str(self.value) + ", instances=" + str(len(self.instances)) + "):")
         self.definition.print_graph(tab+'  ')
@@ -28,25 +51,124 @@ class Pattern:
             instance.print_instance(instanceNum, tab+'  ')
             instanceNum += 1
     
-    def write_instances_to_file(self, outputFileName):
-        """Write instances of pattern to given file name in JSON format."""
-        outputFile = open(outputFileName, 'w')
-        outputFile.write('[\n')
-        firstOne = True
+    def write_instances_to_file(self, outputFileName, compress=False):
+        """Write instances of pattern to given file name in JSON format, gzip-compressed if compress is True."""
+        writer = Graph.GraphWriter(outputFileName, compress)
         for instance in self.instances:
-            if firstOne:
-                firstOne = False
-            else:
-                outputFile.write(',\n')
-            instance.write_to_file(outputFile)
-        outputFile.write('\n]\n')
-        outputFile.close()
+            writer.write_vertices(instance.vertices)
+            writer.write_edges(instance.edges)
+        writer.close()
 
+# An instance created by extending another instance is stored as a delta: a pointer to the parent instance plus
+# the added edge (and implicitly any of its vertices not in the parent). The instance's own vertex and edge sets
+# are only materialized when first accessed, e.g., when its pattern is extended or written out, so that the many
+# extensions discarded during the search never copy their parent's sets. An instance also keeps its frontier, the
+# edges incident on its vertices but not in the instance, which is updated from the parent's frontier when possible.
 class Instance:
     
-    def __init__(self):
-        self.vertices = OrderedSet()
-        self.edges = OrderedSet()
+    def __init__(self, parent=None, edge=None):
+        self.parent = parent # instance extended by edge; None once materialized
+        self.edge = edge
+        self.vertexSet = None
+        self.edgeSet = None
+        if parent is None:
+            self.vertexSet = OrderedSet()
+            self.edgeSet = OrderedSet()
+        self.identityHash = None # cached by identity_hash()
+        self.frontierSet = None # cached by frontier()
+        self.timestampList = None # cached by timestamps()
+    
+    @property
+    def vertices(self):
+        if self.parent is not None:
+            self.materialize()
+        return self.vertexSet
+    
+    @vertices.setter
+    def vertices(self, vertices):
+        self.materialize()
+        self.vertexSet = vertices
+    
+    @property
+    def edges(self):
+        if self.parent is not None:
+            self.materialize()
+        return self.edgeSet
+    
+    @edges.setter
+    def edges(self, edges):
+        self.materialize()
+        self.edgeSet = edges
+    
+    def materialize(self):
+        """Build the instance's own vertex and edge sets from its parent and added edge, and drop the parent.
+        If the parent's frontier is known, the instance's frontier is derived from it at the same time."""
+        if self.parent is None:
+            return
+        parent = self.parent
+        addedVertices = self.added_vertices()
+        self.vertexSet = OrderedSet(parent.vertices)
+        for vertex in addedVertices:
+            self.vertexSet.add(vertex)
+        self.edgeSet = OrderedSet(parent.edges)
+        self.edgeSet.add(self.edge)
+        if parent.frontierSet is not None:
+            # Only the added edge leaves the frontier, and only edges of added vertices can join it
+            self.frontierSet = OrderedSet(parent.frontierSet)
+            self.frontierSet.discard(self.edge)
+            for vertex in addedVertices:
+                for edge in vertex.edges:
+                    if edge not in self.edgeSet:
+                        self.frontierSet.add(edge)
+        self.parent = None
+        self.edge = None
+    
+    def frontier(self):
+        """Returns the OrderedSet of edges incident on the instance's vertices that are not in the instance, in order of
+        the instance's vertices. Computed once, so the instance and graph must not be changed afterwards."""
+        if self.parent is not None:
+            self.materialize()
+        if self.frontierSet is None:
+            self.frontierSet = OrderedSet([e for v in self.vertexSet for e in v.edges]) - self.edgeSet
+        return self.frontierSet
+    
+    def timestamps(self):
+        """Returns the sorted tuple of the distinct timestamps of the instance's vertices and edges. Computed once, and
+        derived from the parent's timestamps when these are known, by inserting those of the added edge and vertices."""
+        if self.timestampList is None:
+            if (self.parent is not None) and (self.parent.timestampList is not None):
+                timestamps = list(self.parent.timestampList)
+                for element in [self.edge] + self.added_vertices():
+                    index = bisect.bisect_left(timestamps, element.timestamp)
+                    if (index == len(timestamps)) or (timestamps[index] != element.timestamp):
+                        timestamps.insert(index, element.timestamp)
+                self.timestampList = tuple(timestamps)
+            else:
+                timestamps = set(vertex.timestamp for vertex in self.iter_vertices())
+                timestamps.update(edge.timestamp for edge in self.iter_edges())
+                self.timestampList = tuple(sorted(timestamps))
+        return self.timestampList
+    
+    def iter_vertices(self):
+        """Iterate over the vertices of the instance, in order, without materializing them."""
+        if self.parent is None:
+            return iter(self.vertexSet)
+        return itertools.chain(self.parent.vertices, self.added_vertices())
+    
+    def iter_edges(self):
+        """Iterate over the edges of the instance, in order, without materializing them."""
+        if self.parent is None:
+            return iter(self.edgeSet)
+        return itertools.chain(self.parent.edges, (self.edge,))
+    
+    def added_vertices(self):
+        """Returns list of the vertices of the added edge that are not in the parent instance."""
+        parentVertices = self.parent.vertices
+        addedVertices = []
+        for vertex in (self.edge.source, self.edge.target):
+            if (vertex not in parentVertices) and (vertex not in addedVertices):
+                addedVertices.append(vertex)
+        return addedVertices
     
     def print_instance (self, instanceNum, tab=""):
         print(tab + "Instance " + str(instanceNum) + ":")
@@ -55,23 +177,30 @@ class Instance:
         for edge in self.edges:
             edge.print_edge(tab+'  ')
             
-    def write_to_file(self, outputFile):
-        """Write instance to given file stream in JSON format."""
-        firstOne = True
-        for vertex in self.vertices:
-            if firstOne:
-                firstOne = False
-            else:
-                outputFile.write(',\n')
-            vertex.write_to_file(outputFile)
-        outputFile.write(',\n')
-        firstOne = True
-        for edge in self.edges:
-            if firstOne:
-                firstOne = False
+    def identity_hash(self):
+        """Returns a hash of the set of the instance's edges (see EdgeHash); the vertices of an instance are the
+        endpoints of its edges, so matching instances have the same hash. For a delta, the hash is combined from the
+        parent's hash and the added edge's hash, so extending an instance does not copy its parent's edges. Computed
+        once, so the instance must not be changed afterwards."""
+        if self.identityHash is None:
+            if self.parent is not None:
+                self.identityHash = self.parent.identity_hash() ^ EdgeHash(self.edge)
             else:
-                outputFile.write(',\n')
-            edge.write_to_file(outputFile)
+                self.identityHash = 0
+                for edge in self.edgeSet:
+                    self.identityHash ^= EdgeHash(edge)
+        return self.identityHash
+    
+    def num_edges(self):
+        if self.parent is not None:
+            return len(self.parent.edges) + 1
+        return len(self.edgeSet)
+    
+    def has_edge(self, edge):
+        """Returns True if the given edge is in the instance, without materializing it."""
+        if self.parent is not None:
+            return ((edge is self.edge) or (edge in self.parent.edges))
+        return (edge in self.edgeSet)
     
     def max_timestamp(self):
         """Returns the maximum timestamp over all vertices and edges in the instance."""
@@ -80,6 +209,18 @@ class Instance:
         return max(maxTimeStampVertex.timestamp, maxTimeStampEdge.timestamp)
         
 
+def EdgeHash(edge):
+    """Returns a well-mixed 64-bit hash of the given edge object. The hashes of the distinct edges of an instance are
+    combined by exclusive or, which does not depend on the order in which the edges were added."""
+    return (hash(edge) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+
+def SameEdges(instance1, instance2):
+    """Returns True if the given instances have the same edges, in any order."""
+    if instance1.num_edges() != instance2.num_edges():
+        return False
+    return all(instance2.has_edge(edge) for edge in instance1.iter_edges())
+
+
 # ----- Pattern and Instance Creation
 
 def CreateInstanceFromEdge(edge):
@@ -96,65 +237,115 @@ def CreatePatternFromInstances(definition, instances):
     pattern.instances = instances
     return pattern
 
+def PatternToIds(pattern):
+    """Return a compact, picklable form of the given pattern, where instances are represented by the IDs of their
+    vertices and edges in the graph."""
+    instanceIds = [InstanceToIds(instance) for instance in pattern.instances]
+    return (pattern.definition, instanceIds, pattern.value)
+
+def PatternFromIds(graph, patternIds):
+    """Return pattern from its compact form (see PatternToIds), with instances found in the given graph."""
+    definition, instanceIds, value = patternIds
+    instances = [InstanceFromIds(graph, vertexIds, edgeIds) for vertexIds, edgeIds in instanceIds]
+    pattern = CreatePatternFromInstances(definition, instances)
+    pattern.value = value
+    return pattern
+
+def InstanceToIds(instance):
+    """Return the IDs of the vertices and edges of the given instance, in order."""
+    vertexIds = [vertex.id for vertex in instance.iter_vertices()]
+    edgeIds = [edge.id for edge in instance.iter_edges()]
+    return (vertexIds, edgeIds)
+
+def InstanceFromIds(graph, vertexIds, edgeIds):
+    """Return instance consisting of the vertices and edges with the given IDs in the given graph."""
+    instance = Instance()
+    for vertexId in vertexIds:
+        instance.vertices.add(graph.vertices[vertexId])
+    for edgeId in edgeIds:
+        instance.edges.add(graph.edges[edgeId])
+    return instance
+
 # ----- Pattern Extension
 
 def ExtendPattern (parameters, pattern):
     """Return list of patterns created by extending each instance of the given pattern by one edge in all possible ways,
        and then collecting matching extended instances together into new patterns."""
     extendedInstances = []
+    extendedInstanceIndex = InstanceIndex()
+    numNewInstances = 0
     for instance in pattern.instances:
         newInstances = ExtendInstance(instance)
+        numNewInstances += len(newInstances)
         for newInstance in newInstances:
-            InsertNewInstance(extendedInstances, newInstance)
-    newPatterns = []
-    while extendedInstances:
-        newInstance = extendedInstances.pop(0)
-        newInstanceGraph = Graph.CreateGraphFromInstance(newInstance)
-        if parameters.temporal:
-            newInstanceGraph.TemporalOrder()
-        matchingInstances = [newInstance]
-        nonmatchingInstances = []
-        for extendedInstance in extendedInstances:
-            extendedInstanceGraph = Graph.CreateGraphFromInstance(extendedInstance)
-            if parameters.temporal:
-                extendedInstanceGraph.TemporalOrder()
-            if Graph.GraphMatch(newInstanceGraph,extendedInstanceGraph) and (not InstancesOverlap(parameters.overlap, matchingInstances, extendedInstance)):
-                matchingInstances.append(extendedInstance)
-            else:
-                nonmatchingInstances.append(extendedInstance)
-        extendedInstances = nonmatchingInstances
-        newPattern = CreatePatternFromInstances(newInstanceGraph, matchingInstances)
-        newPatterns.append(newPattern)
-    return newPatterns
+            InsertNewInstance(extendedInstances, newInstance, extendedInstanceIndex)
+    Stats.gStats.count('extendInstanceCalls', len(pattern.instances))
+    Stats.gStats.count('instancesGenerated', numNewInstances)
+    Stats.gStats.count('instancesDuplicate', numNewInstances - len(extendedInstances))
+    # Create each extended instance's graph once, and group instances by graph signature
+    instanceGroups = {}
+    for instanceIndex, extendedInstance in enumerate(extendedInstances):
+        instanceGraph = Graph.CreateGraphFromInstance(extendedInstance, parameters.temporal)
+        signature = Graph.GraphSignature(instanceGraph)
+        if signature not in instanceGroups:
+            instanceGroups[signature] = []
+        instanceGroups[signature].append((instanceIndex, extendedInstance, instanceGraph))
+    # Only instances with the same signature can match, so collect patterns within each group
+    indexedPatterns = []
+    numOverlapping = 0
+    for instanceTriples in instanceGroups.values():
+        while instanceTriples:
+            seedIndex, newInstance, newInstanceGraph = instanceTriples[0]
+            matchingInstances = [newInstance]
+            matchingInstanceIndex = InstanceIndex(parameters.overlap)
+            matchingInstanceIndex.add(newInstance)
+            nonmatchingTriples = []
+            for instanceTriple in instanceTriples[1:]:
+                extendedInstance = instanceTriple[1]
+                extendedInstanceGraph = instanceTriple[2]
+                if Graph.GraphMatch(newInstanceGraph,extendedInstanceGraph):
+                    if not InstancesOverlap(parameters.overlap, matchingInstances, extendedInstance, matchingInstanceIndex):
+                        matchingInstances.append(extendedInstance)
+                        matchingInstanceIndex.add(extendedInstance)
+                        continue
+                    numOverlapping += 1
+                nonmatchingTriples.append(instanceTriple)
+            instanceTriples = nonmatchingTriples
+            newPattern = CreatePatternFromInstances(newInstanceGraph, matchingInstances)
+            indexedPatterns.append((seedIndex, newPattern))
+    Stats.gStats.count('instancesOverlapping', numOverlapping)
+    # Return patterns in order of their first instance, as if all instances were compared pairwise
+    indexedPatterns.sort(key = lambda indexedPattern: indexedPattern[0])
+    return [newPattern for seedIndex, newPattern in indexedPatterns]
 
 def ExtendInstance (instance):
     """Returns list of new instances created by extending the given instance by one new edge in all possible ways."""
     newInstances = []
-    unusedEdges = OrderedSet([e for v in instance.vertices for e in v.edges]) - instance.edges
-    for edge in unusedEdges:
+    for edge in instance.frontier():
         newInstance = ExtendInstanceByEdge(instance, edge)
         newInstances.append(newInstance)
     return newInstances
 
 def ExtendInstanceByEdge(instance, edge):
-    """Create and return new instance built from given instance and adding given edge and vertices of edge if new."""
-    newInstance = Instance()
-    newInstance.vertices = OrderedSet(instance.vertices)
-    newInstance.edges = OrderedSet(instance.edges)
-    newInstance.edges.add(edge)
-    newInstance.vertices.add(edge.source)
-    newInstance.vertices.add(edge.target)
-    return newInstance
-
-def InsertNewInstance(instanceList, newInstance):
-    """Add newInstance to instanceList if it does not match an instance already on the list."""
-    match = False
-    for instance in instanceList:
-        if (InstanceMatch(instance,newInstance)):
-            match = True
-            break
+    """Create and return new instance built from given instance and adding given edge and vertices of edge if new.
+    The new instance is a delta on the given instance; its vertex and edge sets are built when first needed."""
+    return Instance(instance, edge)
+
+def InsertNewInstance(instanceList, newInstance, instanceIndex=None):
+    """Add newInstance to instanceList if it does not match an instance already on the list. If an InstanceIndex of
+    the list is given, it is used to find a match and updated with newInstance; otherwise, the list is scanned."""
+    if instanceIndex is not None:
+        match = instanceIndex.contains(newInstance)
+    else:
+        match = False
+        for instance in instanceList:
+            if (InstanceMatch(instance,newInstance)):
+                match = True
+                break
     if not match:
         instanceList.append(newInstance)
+        if instanceIndex is not None:
+            instanceIndex.add(newInstance)
 
 def InstanceMatch(instance1,instance2):
     """Return True if given instances match, i.e., contain the same vertex and edge object instances."""
@@ -163,12 +354,15 @@ def InstanceMatch(instance1,instance2):
     else:
         return False
 
-def InstancesOverlap(overlap, instanceList, instance):
+def InstancesOverlap(overlap, instanceList, instance, instanceIndex=None):
     """Returns True if instance overlaps with an instance in the given instanceList
     according to the overlap parameter, which indicates what type of overlap ignored.
     Overlap="none" means no overlap ignored. Overlap="vertex" means vertex overlap
     ignored. Overlap="edge" means vertex and edge overlap ignored, but the instances
-    cannot be identical."""
+    cannot be identical. If an InstanceIndex of the list, created with the same overlap,
+    is given, overlap is found by lookup rather than by scanning the list."""
+    if instanceIndex is not None:
+        return instanceIndex.overlaps(instance)
     for instance2 in instanceList:
         if InstanceOverlap(overlap, instance, instance2):
             return True
@@ -184,45 +378,135 @@ def InstanceOverlap(overlap, instance1, instance2):
     else: # overlap == "none"
         return instance1.vertices.intersect(instance2.vertices)
 
+class InstanceIndex:
+    """Index of a collection of instances by the hash of their edges (see Instance.identity_hash) and, depending on
+    the overlap parameter, by the vertices (overlap="none") or edges (overlap="vertex") they occupy. Checking
+    whether an instance matches or overlaps the collection then costs time proportional to its own size."""
+    
+    def __init__(self, overlap="edge"):
+        self.overlap = overlap
+        self.identities = {} # hash of edges -> instances with that hash
+        self.vertexOwners = {} # vertex -> first instance containing it
+        self.edgeOwners = {} # edge -> first instance containing it
+    
+    def add(self, instance):
+        identityHash = instance.identity_hash()
+        if identityHash not in self.identities:
+            self.identities[identityHash] = []
+        self.identities[identityHash].append(instance)
+        if self.overlap == "none":
+            for vertex in instance.iter_vertices():
+                self.vertexOwners.setdefault(vertex, instance)
+        elif self.overlap == "vertex":
+            for edge in instance.iter_edges():
+                self.edgeOwners.setdefault(edge, instance)
+    
+    def contains(self, instance):
+        """Returns True if an instance matching the given instance is in the index. Edges are only compared with those
+        of indexed instances with the same hash."""
+        sameHashInstances = self.identities.get(instance.identity_hash())
+        if sameHashInstances is None:
+            return False
+        return any(SameEdges(instance, indexedInstance) for indexedInstance in sameHashInstances)
+    
+    def overlaps(self, instance):
+        """Returns True if the given instance overlaps an indexed instance according to the overlap parameter.
+        See InstancesOverlap for explanation."""
+        if self.overlap == "edge":
+            return self.contains(instance)
+        elif self.overlap == "vertex":
+            edgeOwners = self.edgeOwners
+            return any((edge in edgeOwners) for edge in instance.iter_edges())
+        else: # overlap == "none"
+            vertexOwners = self.vertexOwners
+            return any((vertex in vertexOwners) for vertex in instance.iter_vertices())
+
 
 # ----- Pattern List Operations
 
-def PatternListInsert(newPattern, patternList, maxLength, valueBased):
-    """Insert newPattern into patternList. If newPattern is isomorphic to an existing pattern on patternList, then keep higher-valued
-       pattern. The list is kept in decreasing order by pattern value. If valueBased=True, then maxLength represents the maximum number
-       of different-valued patterns on the list; otherwise, maxLength represents the maximum number of patterns on the list.
-       Assumes given patternList already conforms to maximums."""
-    # Check if newPattern unique (i.e., non-isomorphic or isomorphic but better-valued)
-    for pattern in patternList:
-        if (Graph.GraphMatch(pattern.definition,newPattern.definition)):
-            if (pattern.value >= newPattern.value):
-                return # newPattern already on list with same or better value
-            else:
-                # newpattern isomorphic to existing pattern, but better valued
-                patternList.remove(pattern)
-                break
-    # newPattern unique, so insert in order by value
-    insertAtIndex = 0
-    for pattern in patternList:
-        if newPattern.value > pattern.value:
-            break
-        insertAtIndex += 1
-    patternList.insert(insertAtIndex, newPattern)
-    # check if patternList needs to be trimmed
-    if valueBased:
-        uniqueValues = UniqueValues(patternList)
-        if len(uniqueValues) > maxLength:
-            removeValue = uniqueValues[-1]
-            while (patternList[-1].value == removeValue):
-                patternList.pop(-1)
-    else:
-        if len(patternList) > maxLength:
-            patternList.pop(-1)
-
-def UniqueValues(patternList):
-    """Returns list of unique values of patterns in given pattern list, in same order."""
-    uniqueValues = []
-    for pattern in patternList:
-        if pattern.value not in uniqueValues:
-            uniqueValues.append(pattern.value)
-    return uniqueValues
+class PatternList:
+    """List of patterns kept in decreasing order by value (ties in order of insertion), with no two matching patterns, and trimmed to maxLength patterns or, if valueBased=True, to maxLength
+    different values. Patterns are indexed by graph signature (see Graph.GraphSignature), so a new pattern is only
+    matched against patterns with the same signature; the order is kept with binary search on (-value, insertion
+    number) keys; and the number of patterns with each value is maintained incrementally."""
+    
+    def __init__(self, maxLength, valueBased):
+        self.maxLength = maxLength
+        self.valueBased = valueBased
+        self.patterns = []
+        self.orderKeys = [] # (-value, insertion number) of each pattern, in increasing order
+        self.patternKeys = {} # pattern -> its order key
+        self.signatures = {} # signature -> patterns with that signature
+        self.valueCounts = {} # value -> number of patterns with that value
+        self.numInserted = 0
+    
+    def __len__(self):
+        return len(self.patterns)
+    
+    def __iter__(self):
+        return iter(self.patterns)
+    
+    def __getitem__(self, index):
+        return self.patterns[index]
+    
+    def insert(self, newPattern):
+        """Insert newPattern into the list. If newPattern matches a pattern on the list, then keep the higher-valued one
+        (the existing one if equal)."""
+        signature = Graph.GraphSignature(newPattern.definition)
+        samePatterns = self.signatures.get(signature, [])
+        for pattern in sorted(samePatterns, key = lambda p: self.patternKeys[p]):
+            if (Graph.GraphMatch(pattern.definition,newPattern.definition)):
+                if (pattern.value >= newPattern.value):
+                    return # newPattern already on list with same or better value
+                else:
+                    # newpattern isomorphic to existing pattern, but better valued
+                    self.remove(pattern)
+                    break
+        # newPattern unique, so insert in order by value
+        self.add(newPattern, signature)
+        # check if list needs to be trimmed
+        if self.valueBased:
+            if len(self.valueCounts) > self.maxLength:
+                removeValue = self.patterns[-1].value
+                while (self.patterns and (self.patterns[-1].value == removeValue)):
+                    self.remove(self.patterns[-1])
+        else:
+            if len(self.patterns) > self.maxLength:
+                self.remove(self.patterns[-1])
+    
+    def append(self, pattern):
+        """Add pattern at the end of the list, without matching or trimming; used to rebuild a list from its patterns
+        in order."""
+        self.add(pattern, Graph.GraphSignature(pattern.definition))
+    
+    def add(self, pattern, signature):
+        self.numInserted += 1
+        orderKey = (-pattern.value, self.numInserted)
+        insertAtIndex = bisect.bisect_left(self.orderKeys, orderKey)
+        self.patterns.insert(insertAtIndex, pattern)
+        self.orderKeys.insert(insertAtIndex, orderKey)
+        self.patternKeys[pattern] = orderKey
+        if signature not in self.signatures:
+            self.signatures[signature] = []
+        self.signatures[signature].append(pattern)
+        self.valueCounts[pattern.value] = self.valueCounts.get(pattern.value, 0) + 1
+    
+    def excludes(self, value):
+        """Returns True if no pattern with the given value or less can get on the list from now on. Only decided for a
+        full list that is not value-based, whose lowest value never decreases: a pattern only leaves it for a better one."""
+        return ((not self.valueBased) and (len(self.patterns) > 0) and (len(self.patterns) >= self.maxLength)
+                and (value < self.patterns[-1].value))
+    
+    def remove(self, pattern):
+        """Remove given pattern, which must be on the list."""
+        orderKey = self.patternKeys.pop(pattern)
+        index = bisect.bisect_left(self.orderKeys, orderKey)
+        del self.patterns[index]
+        del self.orderKeys[index]
+        signature = Graph.GraphSignature(pattern.definition)
+        self.signatures[signature].remove(pattern)
+        if not self.signatures[signature]:
+            del self.signatures[signature]
+        self.valueCounts[pattern.value] -= 1
+        if self.valueCounts[pattern.value] == 0:
+            del self.valueCounts[pattern.value]
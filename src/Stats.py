@@ -0,0 +1,67 @@
+# Stats.py
+#
+# Written by Larry Holder (holder@wsu.edu).
+#
+# Copyright (c) 2017-2021. Washington State University.
+#
+# Statistics of a Subdue run: counters of the work done in the hot paths of the search (graph matches and the
+# mappings they explore, instance extensions, duplicate and overlapping instances), the time taken by each level of
+# the search and by compression, and the peak memory. They are reported as a dictionary, which can be written to a
+# JSON file (see the --stats option) and is returned by nx_subdue. Counting costs one dictionary update per call, so
+# statistics are always collected.
+#
+# Worker processes (see --workers) count their own work; each worker task resets its counters and returns them with
+# its result, to be merged into those of the main process. So the counters are the same for any number of workers,
+# except for match cache hits and misses: each worker has its own match cache (see Graph.MatchCache), so fewer matches
+# are served from a cache, although the total number of lookups is the same.
+
+import json
+import time
+
+# Counters reported even if zero, so that reports of different runs have the same keys
+gCounterNames = ['graphMatches', 'graphMatchMappings', 'graphMatchMappingLimitHits', 'extendInstanceCalls',
+                 'instancesGenerated', 'instancesDuplicate', 'instancesOverlapping', 'matchCacheHits', 'matchCacheMisses']
+
+class RunStats:
+
+    def __init__(self):
+        self.counters = dict.fromkeys(gCounterNames, 0) # name -> count
+        self.timers = {'compress': 0.0} # name -> total seconds
+        self.levels = [] # one dictionary per level of the search
+        self.iteration = 1 # current iteration, recorded with each level
+        self.startTime = time.time()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def add_level(self, patternSize, parentPatterns, extendedPatterns, seconds):
+        """Record a level of the search, which extended the given number of parent patterns of the given size."""
+        self.levels.append({'iteration': self.iteration, 'patternSize': patternSize, 'parentPatterns': parentPatterns,
+                            'extendedPatterns': extendedPatterns, 'seconds': seconds})
+
+    def reset_counters(self):
+        self.counters = {}
+
+    def merge_counters(self, counters):
+        """Add the given counters, e.g., those returned by a worker process, to these."""
+        for name, n in counters.items():
+            self.count(name, n)
+
+    def report(self, peakMemory=0):
+        """Returns the statistics as a dictionary, given the peak memory in MB (0 if unknown)."""
+        return {'elapsedSeconds': time.time() - self.startTime,
+                'peakMemoryMB': peakMemory,
+                'counters': dict(sorted(self.counters.items())),
+                'timers': dict(sorted(self.timers.items())),
+                'levels': list(self.levels)}
+
+gStats = RunStats() # Replaced at the start of each run by Subdue
+
+def WriteStats(report, fileName):
+    """Write the given statistics report (see RunStats.report) to given file name in JSON format."""
+    with open(fileName, 'w') as statsFile:
+        json.dump(report, statsFile, indent=2)
+        statsFile.write('\n')
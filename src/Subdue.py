@@ -6,117 +6,364 @@
 
 import sys
 import time
-import json
 import contextlib
+import multiprocessing
+import os
+try:
+    import resource # not available on Windows, where the memory budget is ignored
+except ImportError:
+    resource = None
 import Parameters
 import Graph
 import Pattern
+import Checkpoint
+import BinaryGraph
+import Stats
 
 DEBUGFLAG = False
 
-# ***** todos: read graph file incrementally
 def ReadGraph(inputFileName):
-    """Read graph from given filename."""
+    """Read graph from given filename. A file in the binary graph format (see BinaryGraph) is memory-mapped; otherwise,
+    the file is JSON and is parsed incrementally, one vertex or edge at a time. The label table is reset first (see
+    Graph.ResetLabels), so graphs read before must not be mined afterwards."""
+    Graph.ResetLabels()
+    if BinaryGraph.IsBinaryGraphFile(inputFileName):
+        return BinaryGraph.ReadBinaryGraph(inputFileName)
     inputFile = open(inputFileName)
-    jsonGraphArray = json.load(inputFile)
     graph = Graph.Graph()
-    graph.load_from_json(jsonGraphArray)
+    graph.load_from_json_stream(inputFile)
     inputFile.close()
     return graph
    
-def DiscoverPatterns(parameters, graph):
-    """The main discovery loop. Finds and returns best patterns in given graph."""
-    patternCount = 0
-    # get initial one-edge patterns
-    parentPatternList = GetInitialPatterns(parameters, graph)
-    if DEBUGFLAG:
-        print("Initial patterns (" + str(len(parentPatternList)) + "):")
-        for pattern in parentPatternList:
-            pattern.print_pattern('  ')
-    discoveredPatternList = []
-    while ((patternCount < parameters.limit) and parentPatternList):
-        print(str(int(parameters.limit - patternCount)) + " patterns left", flush=True)
-        childPatternList = []
-        # extend each pattern in parent list (***** todo: in parallel)
-        while (parentPatternList):
-            parentPattern = parentPatternList.pop(0)
-            if ((len(parentPattern.instances) > 1) and (patternCount < parameters.limit)):
-                patternCount += 1
-                extendedPatternList = Pattern.ExtendPattern(parameters, parentPattern)
-                while (extendedPatternList):
-                    extendedPattern = extendedPatternList.pop(0)
-                    if DEBUGFLAG:
-                        print("Extended Pattern:")
-                        extendedPattern.print_pattern('  ')
-                    if (len(extendedPattern.definition.edges) <= parameters.maxSize):
-                        # evaluate each extension and add to child list
-                        extendedPattern.evaluate(graph)
+def OutputFileName(parameters, suffix):
+    """Return the name of the output file with the given suffix, with .gz appended if output is gzip-compressed."""
+    outputFileName = parameters.outputFileName + suffix
+    if parameters.gzipOutput:
+        outputFileName += ".gz"
+    return outputFileName
+
+def DiscoverPatterns(parameters, graph, edgeGroups=None, budget=None, checkpoint=None, levelState=None):
+    """The main discovery loop. Finds and returns best patterns in given graph. If given, edgeGroups (see EdgeGroups)
+    supplies the initial patterns. If a budget (see Budget) is given and gets exceeded, no more patterns are extended,
+    and the best of the patterns found so far are returned. If a checkpoint (see Checkpoint) is given, the state of the
+    search is saved to it at the start of each level; the search resumes from such a state if given as levelState."""
+    discoveredPatternList = Pattern.PatternList(parameters.numBest, False) # valueBased = False
+    if levelState:
+        patternCount, parentPatternList, discoveredPatterns = levelState
+        for pattern in discoveredPatterns:
+            discoveredPatternList.append(pattern)
+    else:
+        patternCount = 0
+        # get initial one-edge patterns
+        parentPatternList = GetInitialPatterns(parameters, graph, edgeGroups)
+        if DEBUGFLAG:
+            print("Initial patterns (" + str(len(parentPatternList)) + "):")
+            for pattern in parentPatternList:
+                pattern.print_pattern('  ')
+    pool = CreateWorkerPool(parameters, graph)
+    try:
+        while ((patternCount < parameters.limit) and parentPatternList):
+            if checkpoint:
+                checkpoint.save_level(patternCount, parentPatternList, discoveredPatternList)
+            print(str(int(parameters.limit - patternCount)) + " patterns left", flush=True)
+            levelStartTime = time.time()
+            patternSize = len(parentPatternList[0].definition.edges)
+            numParentsExtended = 0
+            numExtensions = 0
+            childPatternList = Pattern.PatternList(parameters.beamWidth, parameters.valueBased)
+            # select parent patterns to extend; their extensions are independent, so they can be computed in parallel
+            parentsToExtend = []
+            for parentPattern in parentPatternList:
+                if ((len(parentPattern.instances) > 1) and (patternCount < parameters.limit)):
+                    patternCount += 1
+                    parentsToExtend.append(parentPattern)
+            skipPattern = None
+            if parameters.bound:
+                skipPattern = lambda pattern: ExtensionsExcluded(parameters, graph, pattern, childPatternList)
+            extendedPatternLists = ExtendPatterns(parameters, graph, parentsToExtend, pool, skipPattern)
+            # merge extensions into child list in parent order, so results do not depend on number of workers
+            while (parentPatternList):
+                parentPattern = parentPatternList.pop(0)
+                if (parentsToExtend and budget and budget.exceeded()):
+                    parentsToExtend = [] # out of budget, so extend no more patterns
+                if (parentsToExtend and (parentPattern is parentsToExtend[0])):
+                    parentsToExtend.pop(0)
+                    extendedPatternList = next(extendedPatternLists)
+                    if extendedPatternList is None:
+                        extendedPatternList = [] # skipped by the bound, so not extended
+                    else:
+                        numParentsExtended += 1
+                        numExtensions += len(extendedPatternList)
+                        if (pool and skipPattern and skipPattern(parentPattern)):
+                            extendedPatternList = [] # excluded after it was sent to the pool, so discard, as if serial
+                    while (extendedPatternList):
+                        extendedPattern = extendedPatternList.pop(0)
                         if ((not parameters.prune) or (extendedPattern.value >= parentPattern.value)):
-                            Pattern.PatternListInsert(extendedPattern, childPatternList, parameters.beamWidth, parameters.valueBased)
-            # add parent pattern to final discovered list
-            if (len(parentPattern.definition.edges) >= parameters.minSize):
-                Pattern.PatternListInsert(parentPattern, discoveredPatternList, parameters.numBest, False) # valueBased = False
-        parentPatternList = childPatternList
-        if not parentPatternList:
-            print("No more patterns to consider", flush=True)
+                            childPatternList.insert(extendedPattern)
+                # add parent pattern to final discovered list
+                if (len(parentPattern.definition.edges) >= parameters.minSize):
+                    discoveredPatternList.insert(parentPattern)
+            parentPatternList = list(childPatternList)
+            Stats.gStats.add_level(patternSize, numParentsExtended, numExtensions, time.time() - levelStartTime)
+            if not parentPatternList:
+                print("No more patterns to consider", flush=True)
+            if (budget and budget.exceeded()):
+                break
+    finally:
+        if pool:
+            pool.terminate()
     # insert any remaining patterns in parent list on to discovered list
     while (parentPatternList):
         parentPattern = parentPatternList.pop(0)
         if (len(parentPattern.definition.edges) >= parameters.minSize):
-            Pattern.PatternListInsert(parentPattern, discoveredPatternList, parameters.numBest, False) # valueBased = False
-    return discoveredPatternList
-
-def GetInitialPatterns(parameters, graph):
-    """Returns list of single-edge, evaluated patterns in given graph with more than one instance."""
-    initialPatternList = []
-    # Create a graph and an instance for each edge
-    edgeGraphInstancePairs = []
-    for edge in graph.edges.values():
-        graph1 = Graph.CreateGraphFromEdge(edge)
+            discoveredPatternList.insert(parentPattern)
+    return list(discoveredPatternList)
+
+def ExtendAndEvaluatePattern(parameters, graph, parentPattern):
+    """Returns list of evaluated extensions of the given pattern that are within the maximum pattern size."""
+    extendedPatternList = []
+    for extendedPattern in Pattern.ExtendPattern(parameters, parentPattern):
+        if DEBUGFLAG:
+            print("Extended Pattern:")
+            extendedPattern.print_pattern('  ')
+        if (len(extendedPattern.definition.edges) <= parameters.maxSize):
+            extendedPattern.evaluate(graph)
+            extendedPatternList.append(extendedPattern)
+    return extendedPatternList
+
+def ExtendPatterns(parameters, graph, parentPatterns, pool=None, skipPattern=None):
+    """Returns an iterator over the lists of evaluated extensions of the given patterns, in the same order as the
+    patterns. If a worker pool is given, the patterns are extended in parallel by the pool's worker processes.
+    Patterns for which skipPattern returns True are not extended and get None instead of a list. skipPattern is called
+    just before a pattern would be extended serially; with a worker pool, it is called for each batch of patterns, one
+    per worker, just before the batch is sent to the pool (see ExtendPatternBatches)."""
+    if not pool:
+        return (None if (skipPattern and skipPattern(parentPattern)) else ExtendAndEvaluatePattern(parameters, graph, parentPattern)
+                for parentPattern in list(parentPatterns))
+    if skipPattern:
+        return ExtendPatternBatches(graph, list(parentPatterns), pool, skipPattern, parameters.workers)
+    workerResults = pool.imap(ExtendPatternWorker, [Pattern.PatternToIds(parentPattern) for parentPattern in parentPatterns])
+    return (ExtendedPatternsFromWorker(graph, workerResult) for workerResult in workerResults)
+
+def ExtendPatternBatches(graph, parentPatterns, pool, skipPattern, batchSize):
+    """Generates the lists of evaluated extensions of the given patterns, or None for patterns skipped by skipPattern,
+    extending them in the worker pool in batches of the given size. Each batch is checked by skipPattern and sent to the
+    pool only when its first list is requested, so if the caller uses each list before requesting the next, skipPattern
+    can exclude patterns using the extensions of earlier batches."""
+    for batchStart in range(0, len(parentPatterns), batchSize):
+        batch = parentPatterns[batchStart:batchStart+batchSize]
+        skipped = [skipPattern(parentPattern) for parentPattern in batch]
+        patternIds = [Pattern.PatternToIds(parentPattern) for parentPattern, skip in zip(batch, skipped) if not skip]
+        workerResults = pool.imap(ExtendPatternWorker, patternIds)
+        for skip in skipped:
+            yield (None if skip else ExtendedPatternsFromWorker(graph, next(workerResults)))
+
+def ExtendedPatternsFromWorker(graph, workerResult):
+    """Returns the extended patterns in the given result of ExtendPatternWorker, and adds the worker's counters to the
+    statistics of the run."""
+    extendedPatternIdLists, counters = workerResult
+    Stats.gStats.merge_counters(counters)
+    return [Pattern.PatternFromIds(graph, extendedPatternIds) for extendedPatternIds in extendedPatternIdLists]
+
+def ExtensionsExcluded(parameters, graph, pattern, childPatternList):
+    """Returns True if no extension of the given pattern can get on the child list, according to an upper bound on
+    the value of its extensions (see Pattern.value_bound). Then the pattern need not be extended: its extensions would
+    not change the child list, and so neither the patterns extended next nor the discovered patterns."""
+    size = len(pattern.definition.edges)
+    return childPatternList.excludes(pattern.value_bound(graph, parameters.overlap, size + 1, size + 1))
+
+# ----- Parallel Pattern Extension
+
+# Worker processes are forked from the main process, so they inherit the graph and parameters being mined
+# without having to pickle them. Patterns are passed to and from the workers as vertex and edge IDs.
+gWorkerGraph = None
+gWorkerParameters = None
+
+def CreateWorkerPool(parameters, graph):
+    """Returns a pool of worker processes for extending patterns on the given graph, or None if only one worker is
+    requested or worker processes cannot be forked on this platform."""
+    global gWorkerGraph, gWorkerParameters
+    if (parameters.workers <= 1):
+        return None
+    if ('fork' not in multiprocessing.get_all_start_methods()):
+        print("Parallel extension requires fork; using one worker", flush=True)
+        return None
+    gWorkerGraph = graph
+    gWorkerParameters = parameters
+    return multiprocessing.get_context('fork').Pool(parameters.workers)
+
+def ExtendPatternWorker(patternIds):
+    """Worker process routine: extend and evaluate the pattern with the given IDs in the inherited graph. Returns the
+    IDs of the extended patterns and the counters of the work done (see Stats)."""
+    Stats.gStats.reset_counters()
+    parentPattern = Pattern.PatternFromIds(gWorkerGraph, patternIds)
+    extendedPatternList = ExtendAndEvaluatePattern(gWorkerParameters, gWorkerGraph, parentPattern)
+    return ([Pattern.PatternToIds(extendedPattern) for extendedPattern in extendedPatternList], Stats.gStats.counters)
+
+def GetInitialPatterns(parameters, graph, edgeGroups=None):
+    """Returns list of single-edge, evaluated patterns in given graph with more than one instance.
+    Edges are grouped by their one-edge signature (see Graph.EdgeSignature) in one pass, so no graph matching is needed.
+    If edgeGroups is given, its groups and the patterns already collected from them are used instead."""
+    if edgeGroups is None:
+        edgeGroups = EdgeGroups(parameters, graph)
+    indexedPatterns = []
+    for signature in edgeGroups.groups:
+        for seedPosition, definition, instances in edgeGroups.group_patterns(graph, signature):
+            pattern = Pattern.Pattern()
+            pattern.definition = definition
+            pattern.instances = list(instances)
+            pattern.evaluate(graph)
+            indexedPatterns.append((seedPosition, pattern))
+    # Return patterns in order of their seed edge, which is the order in which pairwise matching would find them
+    indexedPatterns.sort(key = lambda indexedPattern: indexedPattern[0])
+    return [pattern for seedPosition, pattern in indexedPatterns]
+
+def CollectEdgeGroup(parameters, edgePairs):
+    """Returns list of (seed position, definition, instances) of the single-edge patterns with more than one instance
+    collected from the given (position, edge) pairs, which all have the same signature and are in graph order.
+    Instances rejected due to overlap seed further patterns with the same definition."""
+    groupPatterns = []
+    while edgePairs:
+        seedPosition, seedEdge = edgePairs[0]
+        graph1 = Graph.CreateGraphFromEdge(seedEdge)
         if parameters.temporal:
             graph1.TemporalOrder()
-        instance1 = Pattern.CreateInstanceFromEdge(edge)
-        edgeGraphInstancePairs.append((graph1,instance1))
-    while edgeGraphInstancePairs:
-        edgePair1 = edgeGraphInstancePairs.pop(0)
-        graph1 = edgePair1[0]
-        instance1 = edgePair1[1]
-        pattern = Pattern.Pattern()
-        pattern.definition = graph1
-        pattern.instances.append(instance1)
+        instances = [Pattern.CreateInstanceFromEdge(seedEdge)]
+        instanceIndex = Pattern.InstanceIndex(parameters.overlap)
+        instanceIndex.add(instances[0])
         nonmatchingEdgePairs = []
-        for edgePair2 in edgeGraphInstancePairs:
-            graph2 = edgePair2[0]
-            instance2 = edgePair2[1]
-            if Graph.GraphMatch(graph1,graph2) and (not Pattern.InstancesOverlap(parameters.overlap, pattern.instances, instance2)):
-                pattern.instances.append(instance2)
+        for edgePair in edgePairs[1:]:
+            instance2 = Pattern.CreateInstanceFromEdge(edgePair[1])
+            if not Pattern.InstancesOverlap(parameters.overlap, instances, instance2, instanceIndex):
+                instances.append(instance2)
+                instanceIndex.add(instance2)
             else:
-                nonmatchingEdgePairs.append(edgePair2)
-        if len(pattern.instances) > 1:
-            pattern.evaluate(graph)
-            initialPatternList.append(pattern)
-        edgeGraphInstancePairs = nonmatchingEdgePairs
-    return initialPatternList
+                nonmatchingEdgePairs.append(edgePair)
+        if len(instances) > 1:
+            groupPatterns.append((seedPosition, graph1, instances))
+        edgePairs = nonmatchingEdgePairs
+    return groupPatterns
+
+class Budget:
+    """Time and memory budget of a run (see parameters timeBudget and memoryBudget), measured from its creation.
+    Once exceeded, a budget stays exceeded."""
+    
+    def __init__(self, parameters):
+        self.startTime = time.time()
+        self.timeBudget = parameters.timeBudget
+        self.memoryBudget = parameters.memoryBudget
+        self.reason = None # "time" or "memory" once exceeded
+    
+    def exceeded(self):
+        """Returns True if the time or memory budget has been exceeded, and reports it the first time."""
+        if self.reason is None:
+            if (self.timeBudget > 0) and (time.time() - self.startTime > self.timeBudget):
+                self.reason = "time"
+            elif (self.memoryBudget > 0) and (PeakMemory() > self.memoryBudget):
+                self.reason = "memory"
+            if self.reason is not None:
+                print("Search stopped early: " + self.reason + " budget exceeded", flush=True)
+        return (self.reason is not None)
 
-def Subdue(parameters, graph):
+def PeakMemory():
+    """Returns the peak memory used by this process so far in MB, or 0 if unknown on this platform."""
+    if resource is None:
+        return 0
+    maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxRss / (1024.0 * 1024.0) # bytes
+    return maxRss / 1024.0 # kilobytes
+
+class EdgeGroups:
+    """The edges of a graph grouped by their one-edge signature (see Graph.EdgeSignature), and the single-edge patterns
+    collected from each group. Edges are numbered by their position in the graph when grouped. After the graph is
+    compressed, update() regroups only the removed and reconnected edges, so that only the groups they left or joined
+    are collected again; the edges and endpoints of other groups, and so their patterns, are unchanged."""
+    
+    def __init__(self, parameters, graph):
+        self.parameters = parameters
+        self.groups = {} # signature -> {edge: position}
+        self.groupPatterns = {} # signature -> list of (seed position, definition, instances); absent if not collected
+        self.positions = {} # edge -> position
+        self.signatures = {} # edge -> signature
+        for position, edge in enumerate(graph.edges.values()):
+            self.positions[edge] = position
+            self.add_edge(edge)
+    
+    def add_edge(self, edge):
+        signature = Graph.EdgeSignature(edge, self.parameters.temporal)
+        self.signatures[edge] = signature
+        if signature not in self.groups:
+            self.groups[signature] = {}
+        self.groups[signature][edge] = self.positions[edge]
+        self.groupPatterns.pop(signature, None)
+    
+    def remove_edge(self, edge):
+        signature = self.signatures.pop(edge)
+        del self.groups[signature][edge]
+        if not self.groups[signature]:
+            del self.groups[signature]
+        self.groupPatterns.pop(signature, None)
+    
+    def group_patterns(self, graph, signature):
+        """Returns the patterns collected from the given group (see CollectEdgeGroup), collecting them if needed."""
+        if signature not in self.groupPatterns:
+            edgePairs = sorted((position, edge) for edge, position in self.groups[signature].items())
+            self.groupPatterns[signature] = CollectEdgeGroup(self.parameters, edgePairs)
+        return self.groupPatterns[signature]
+    
+    def update(self, graph, removedEdges, newVertices):
+        """Update groups after the graph has been compressed, given the edges removed by compression and the new
+        vertices, to which the remaining edges of the compressed instances have been reconnected."""
+        for edge in removedEdges:
+            self.remove_edge(edge)
+            del self.positions[edge]
+        for vertex in newVertices:
+            for edge in vertex.edges:
+                if edge in self.signatures:
+                    self.remove_edge(edge)
+                    self.add_edge(edge)
+
+def Subdue(parameters, graph, info=None):
     """
     Top-level function for Subdue that discovers best pattern in graph.
     Optionally, Subdue can then compress the graph with the best pattern, and iterate.
 
     :param graph: instance of Subdue.Graph
     :param parameters: instance of Subdue.Parameters
+    :param info: optional dictionary, which receives `truncated` -- True if the search was stopped by a time or memory budget,
+        and `stats` -- statistics of the run (see Stats.RunStats.report).
     :return: patterns for each iteration -- a list of iterations each containing discovered patterns.
     """
     startTime = time.time()
+    Stats.gStats = Stats.RunStats()
+    budget = Budget(parameters)
     iteration = 1
-    done = False
     patterns = list()
+    checkpoint = None
+    levelState = None
+    if parameters.checkpointFileName:
+        checkpoint = Checkpoint.Checkpoint(parameters.checkpointFileName)
+        if (parameters.resume and os.path.exists(parameters.checkpointFileName)):
+            graph, iteration, patterns, levelState = checkpoint.read(parameters)
+            print("Resuming from checkpoint " + parameters.checkpointFileName + " at iteration " + str(iteration) + "\n")
+            parameters.print()
+    Graph.gMatcher = parameters.matcher
+    Graph.gMatchCache = Graph.MatchCache(parameters.matchCacheSize)
+    edgeGroups = None
+    if parameters.incremental:
+        edgeGroups = EdgeGroups(parameters, graph)
+    done = False
     while ((iteration <= parameters.iterations) and (not done)):
         iterationStartTime = time.time()
+        Stats.gStats.iteration = iteration
         if (iteration > 1):
             print("----- Iteration " + str(iteration) + " -----\n")
         print("Graph: " + str(len(graph.vertices)) + " vertices, " + str(len(graph.edges)) + " edges")
-        patternList = DiscoverPatterns(parameters, graph)
+        if (checkpoint and (not levelState)):
+            checkpoint.start_iteration(parameters, iteration, graph, patterns)
+        patternList = DiscoverPatterns(parameters, graph, edgeGroups, budget, checkpoint, levelState)
+        levelState = None
         if (not patternList):
             done = True
             print("No patterns found.\n")
@@ -128,27 +375,45 @@ def Subdue(parameters, graph):
                 print("")
             # write machine-readable output, if requested
             if (parameters.writePattern):
-                outputFileName = parameters.outputFileName + "-pattern-" + str(iteration) + ".json"
-                patternList[0].definition.write_to_file(outputFileName)
+                outputFileName = OutputFileName(parameters, "-pattern-" + str(iteration) + ".json")
+                patternList[0].definition.write_to_file(outputFileName, parameters.gzipOutput)
             if (parameters.writeInstances):
-                outputFileName = parameters.outputFileName + "-instances-" + str(iteration) + ".json"
-                patternList[0].write_instances_to_file(outputFileName)
-            if ((iteration < parameters.iterations) or (parameters.writeCompressed)):
-                graph.Compress(iteration, patternList[0])
-            if (iteration < parameters.iterations):
+                outputFileName = OutputFileName(parameters, "-instances-" + str(iteration) + ".json")
+                patternList[0].write_instances_to_file(outputFileName, parameters.gzipOutput)
+            if ((iteration < parameters.iterations) and budget.exceeded()): # checked only if more iterations would run
+                done = True
+                print("Ending iterations - budget exceeded.\n")
+            if (((iteration < parameters.iterations) and (not done)) or (parameters.writeCompressed)):
+                removedEdges = [edge for instance in patternList[0].instances for edge in instance.edges]
+                compressStartTime = time.time()
+                newVertices = graph.Compress(iteration, patternList[0])
+                Stats.gStats.add_time('compress', time.time() - compressStartTime)
+                if edgeGroups:
+                    edgeGroups.update(graph, removedEdges, newVertices)
+                Graph.gMatchCache.clear() # compression adds a new label, so start over
+            if ((iteration < parameters.iterations) and (not done)):
                 # consider another iteration
                 if (len(graph.edges) == 0):
                     done = True
                     print("Ending iterations - graph fully compressed.\n")
             if ((iteration == parameters.iterations) and (parameters.writeCompressed)):
-                outputFileName = parameters.outputFileName + "-compressed-" + str(iteration) + ".json"
-                graph.write_to_file(outputFileName)
+                outputFileName = OutputFileName(parameters, "-compressed-" + str(iteration) + ".json")
+                graph.write_to_file(outputFileName, parameters.gzipOutput)
         if (parameters.iterations > 1):
              iterationEndTime = time.time()
              print("Elapsed time for iteration " + str(iteration) + " = " + str(iterationEndTime - iterationStartTime) + " seconds.\n")
         iteration += 1
     endTime = time.time()
+    if (parameters.matchCacheSize > 0):
+        print("Match cache: " + str(Stats.gStats.counters['matchCacheHits']) + " hits, " +
+              str(Stats.gStats.counters['matchCacheMisses']) + " misses\n")
     print("SUBDUE done. Elapsed time = " + str(endTime - startTime) + " seconds\n")
+    stats = Stats.gStats.report(PeakMemory())
+    if parameters.statsFileName:
+        Stats.WriteStats(stats, parameters.statsFileName)
+    if info is not None:
+        info['truncated'] = (budget.reason is not None) # only if the search was cut short; not checked again
+        info['stats'] = stats
     return patterns
 
 def nx_subdue(
@@ -156,6 +421,7 @@ def nx_subdue(
     node_attributes=None,
     edge_attributes=None,
     verbose=False,
+    return_info=False,
     **subdue_parameters
 ):
     """
@@ -163,6 +429,7 @@ def nx_subdue(
     :param node_attributes: (Default: None)   -- attributes on the nodes to use for pattern matching, use `None` for all
     :param edge_attributes: (Default: None)   -- attributes on the edges to use for pattern matching, use `None` for all
     :param verbose: (Default: False)          -- if True, print progress, as well as report each found pattern
+    :param return_info: (Default: False)      -- if True, return a pair of the output and a dictionary of details of the run (see Subdue)
 
     :param beamWidth: (Default: 4)            -- Number of patterns to retain after each expansion of previous patterns; based on value.
     :param iterations: (Default: 1)           -- Iterations of Subdue's discovery process. If more than 1, Subdue compresses graph with best pattern before next run. If 0, then run until no more compression (i.e., set to |E|).
@@ -174,6 +441,16 @@ def nx_subdue(
     :param prune: (Default: False)            -- Remove any patterns that are worse than their parent.
     :param valueBased: (Default: False)       -- Retain all patterns with the top beam best values.
     :param temporal: (Default: False)         -- Discover static (False) or temporal (True) patterns
+    :param workers: (Default: 1)              -- Number of worker processes used to extend the patterns in the beam.
+    :param matcher: (Default: approximate)    -- Graph matcher (approximate, exact, vf2, canonical)
+    :param matchCacheSize: (Default: 0)       -- Maximum number of graph match results to cache; default (0) is no cache.
+    :param bound: (Default: False)            -- Skip extending patterns whose extensions cannot get on the beam, by an upper bound on their value.
+    :param incremental: (Default: False)      -- Keep initial patterns across iterations, collecting again only those changed by compression.
+    :param timeBudget: (Default: 0)           -- Seconds after which the search stops and returns the best patterns so far; default (0) is no limit.
+    :param memoryBudget: (Default: 0)         -- Peak memory (MB) at which the search stops and returns the best patterns so far; default (0) is no limit.
+    :param checkpointFileName: (Default: "")  -- File to which the state of the run is saved at each iteration and search level; default ("") is none.
+    :param resume: (Default: False)           -- Resume the run from the checkpoint file, if it exists.
+    :param statsFileName: (Default: "")       -- File to which statistics of the run are written in JSON format; default ("") is none.
 
     :return: list of patterns, where each pattern is a list of pattern instances, with an instance being a dictionary
     containing 
@@ -188,21 +465,27 @@ def nx_subdue(
     parameters = Parameters.Parameters()
     if len(subdue_parameters) > 0:
         parameters.set_parameters_from_kwargs(**subdue_parameters)
+    Graph.ResetLabels()
     subdue_graph = Graph.Graph()
     subdue_graph.load_from_networkx(graph, node_attributes, edge_attributes)
     parameters.set_defaults_for_graph(subdue_graph)
+    info = {}
     if verbose:
-        iterations = Subdue(parameters, subdue_graph)
+        iterations = Subdue(parameters, subdue_graph, info)
     else:
         with contextlib.redirect_stdout(None):
-            iterations = Subdue(parameters, subdue_graph)
+            iterations = Subdue(parameters, subdue_graph, info)
     iterations = unwrap_output(iterations)
     if parameters.iterations == 1:
         if len(iterations) == 0:
-            return None
-        return iterations[0]
+            output = None
+        else:
+            output = iterations[0]
     else:
-        return iterations
+        output = iterations
+    if return_info:
+        return output, info
+    return output
 
 def unwrap_output(iterations):
     """
@@ -226,11 +509,14 @@ def main():
     print("SUBDUE v1.4 (python)\n")
     parameters = Parameters.Parameters()
     parameters.set_parameters(sys.argv)
-    graph = ReadGraph(parameters.inputFileName)
-    #outputFileName = parameters.outputFileName + ".dot"
-    #graph.write_to_dot(outputFileName)
-    parameters.set_defaults_for_graph(graph)
-    parameters.print()
+    if (parameters.resume and os.path.exists(parameters.checkpointFileName)):
+        graph = None # Subdue restores graph and parameters from the checkpoint, and prints the parameters
+    else:
+        graph = ReadGraph(parameters.inputFileName)
+        #outputFileName = parameters.outputFileName + ".dot"
+        #graph.write_to_dot(outputFileName)
+        parameters.set_defaults_for_graph(graph)
+        parameters.print()
     Subdue(parameters, graph)
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+# Benchmarks the main steps of Subdue on synthetic graphs of growing size (see synthetic_graph.py): collecting the
+# initial patterns (GetInitialPatterns), extending patterns (ExtendPattern), matching pattern definitions
+# (GraphMatch), inserting patterns into a beam (PatternList.insert), the whole search (DiscoverPatterns), and
+# compressing the graph with the best pattern (Compress). Each step is timed separately, as the best of several runs.
+# Patterns and instances cache results on first use (e.g., their vertex sets and graph signatures), so each run of a
+# step is given new patterns, created before it is timed.
+#
+# The results, including a summary of the best patterns found, are written to a JSON file. Given the results of an
+# earlier run as a baseline, the timings are compared with it, and the best patterns are checked to be identical;
+# the exit status is 1 if they are not, e.g., after a change that should not affect the discovered patterns.
+#
+# Usage (from the testing directory):
+#   python benchmark.py [--sizes 1000,4000,16000] [--seed 1] [--repeat 3] [--temporal]
+#                       [--output benchmark-results.json] [--baseline <results file>]
+
+import contextlib
+import hashlib
+import json
+import platform
+import sys
+import time
+
+sys.path.append('../src')
+import Graph
+import Parameters
+import Pattern
+import Stats
+from Subdue import GetInitialPatterns, DiscoverPatterns
+from synthetic_graph import synthetic_graph
+
+BENCHMARK_VERSION = 2
+max_match_patterns = 100 # GraphMatch is timed on all pairs of at most this many extended patterns
+
+
+def best_time(function, repeat, setup=None):
+    """Returns the least elapsed time of repeat calls of function, and the result of the last call. If setup is given,
+    it is called before each call, untimed, and its result is passed to function."""
+    best = None
+    for _ in range(repeat):
+        if setup:
+            argument = setup()
+            start_time = time.perf_counter()
+            result = function(argument)
+        else:
+            start_time = time.perf_counter()
+            result = function()
+        elapsed_time = time.perf_counter() - start_time
+        if (best is None) or (elapsed_time < best):
+            best = elapsed_time
+    return best, result
+
+
+def pattern_summary(pattern):
+    """Returns a description of the given pattern that does not depend on internal label ids: its value, number of
+    instances, edges (as sorted label descriptions) and a digest of the edge IDs of its instances."""
+    edges = []
+    for edge in pattern.definition.edges.values():
+        arrow = '->' if edge.directed else '--'
+        edges.append(json.dumps(edge.source.attributes, sort_keys=True) + arrow + json.dumps(edge.target.attributes, sort_keys=True)
+                     + ' ' + json.dumps(edge.attributes, sort_keys=True))
+    instances = sorted(sorted(edge.id for edge in instance.edges) for instance in pattern.instances)
+    digest = hashlib.sha1(json.dumps(instances).encode('utf-8')).hexdigest()
+    return {'value': pattern.value, 'instances': len(pattern.instances), 'edges': sorted(edges), 'instanceDigest': digest}
+
+
+def benchmark_size(generator_parameters, repeat):
+    """Returns the timings, counts and best patterns for a synthetic graph with the given generator parameters."""
+    graph = synthetic_graph(**generator_parameters)
+    parameters = Parameters.Parameters()
+    parameters.set_parameters_from_kwargs(temporal=generator_parameters['temporal'])
+    parameters.set_defaults_for_graph(graph)
+    timings = {}
+    counts = {'vertices': len(graph.vertices), 'edges': len(graph.edges)}
+    timings['GetInitialPatterns'], initial_patterns = best_time(lambda: GetInitialPatterns(parameters, graph), repeat)
+    counts['initialPatterns'] = len(initial_patterns)
+    def parent_patterns():
+        return GetInitialPatterns(parameters, graph)[:parameters.beamWidth]
+    def extend_patterns(parents):
+        return [extended_pattern for parent_pattern in parents
+                for extended_pattern in Pattern.ExtendPattern(parameters, parent_pattern)]
+    def extended_patterns():
+        patterns = extend_patterns(parent_patterns())
+        for pattern in patterns:
+            pattern.evaluate(graph)
+        return patterns
+    timings['ExtendPattern'], patterns = best_time(extend_patterns, repeat, parent_patterns)
+    counts['extendedPatterns'] = len(patterns)
+    def match_definitions(patterns):
+        definitions = [pattern.definition for pattern in patterns[:max_match_patterns]]
+        return sum(1 for definition1 in definitions for definition2 in definitions if Graph.GraphMatch(definition1, definition2))
+    timings['GraphMatch'], counts['matchingPairs'] = best_time(match_definitions, repeat, extended_patterns)
+    counts['matchPairs'] = min(len(patterns), max_match_patterns) ** 2
+    def insert_patterns(patterns):
+        pattern_list = Pattern.PatternList(parameters.beamWidth, parameters.valueBased)
+        for pattern in patterns:
+            pattern_list.insert(pattern)
+        return pattern_list
+    timings['PatternList.insert'], _ = best_time(insert_patterns, repeat, extended_patterns)
+    def discover_patterns():
+        Stats.gStats = Stats.RunStats()
+        with contextlib.redirect_stdout(None):
+            return DiscoverPatterns(parameters, graph)
+    timings['DiscoverPatterns'], best_patterns = best_time(discover_patterns, repeat)
+    counters = Stats.gStats.counters
+    # compression changes the graph, so each run compresses a new copy of it
+    compress_time = None
+    for _ in range(repeat if best_patterns else 0):
+        compress_graph = synthetic_graph(**generator_parameters)
+        best_pattern = Pattern.PatternFromIds(compress_graph, Pattern.PatternToIds(best_patterns[0]))
+        start_time = time.perf_counter()
+        compress_graph.Compress(1, best_pattern)
+        elapsed_time = time.perf_counter() - start_time
+        if (compress_time is None) or (elapsed_time < compress_time):
+            compress_time = elapsed_time
+    timings['Compress'] = compress_time
+    return {'numEdges': generator_parameters['num_edges'], 'counts': counts, 'timings': timings, 'counters': counters,
+            'bestPatterns': [pattern_summary(pattern) for pattern in best_patterns]}
+
+
+def compare_with_baseline(results, baseline):
+    """Prints the timings of results relative to those of baseline, and returns True if the best patterns found for
+    each graph size are the same in both."""
+    if baseline.get('generator') != results['generator']:
+        print("Baseline was run with different generator parameters; not compared.")
+        return False
+    baseline_sizes = {size_results['numEdges']: size_results for size_results in baseline['sizes']}
+    same = True
+    for size_results in results['sizes']:
+        baseline_results = baseline_sizes.get(size_results['numEdges'])
+        if baseline_results is None:
+            continue
+        ratios = []
+        for step, seconds in size_results['timings'].items():
+            baseline_seconds = baseline_results['timings'].get(step)
+            if baseline_seconds:
+                ratios.append(step + ' ' + ('%.2f' % (seconds / baseline_seconds)) + 'x')
+        print("  " + str(size_results['numEdges']).rjust(8) + " edges, time relative to baseline: " + ', '.join(ratios))
+        if size_results['bestPatterns'] != baseline_results['bestPatterns']:
+            print("  " + str(size_results['numEdges']).rjust(8) + " edges: best patterns differ from baseline")
+            same = False
+    return same
+
+
+def main():
+    sizes = [1000, 4000, 16000]
+    seed = 1
+    repeat = 3
+    temporal = False
+    output_file_name = 'benchmark-results.json'
+    baseline_file_name = None
+    args = sys.argv
+    index = 1
+    while index < len(args):
+        option_name = args[index]
+        if option_name == '--sizes':
+            index += 1
+            sizes = [int(size) for size in args[index].split(',')]
+        elif option_name == '--seed':
+            index += 1
+            seed = int(args[index])
+        elif option_name == '--repeat':
+            index += 1
+            repeat = int(args[index])
+        elif option_name == '--temporal':
+            temporal = True
+        elif option_name == '--output':
+            index += 1
+            output_file_name = args[index]
+        elif option_name == '--baseline':
+            index += 1
+            baseline_file_name = args[index]
+        else:
+            print("Unknown option " + option_name)
+            sys.exit(2)
+        index += 1
+    results = {'version': BENCHMARK_VERSION, 'python': platform.python_version(), 'platform': platform.platform(),
+               'generator': {'seed': seed, 'temporal': temporal}, 'repeat': repeat, 'sizes': []}
+    steps = ['GetInitialPatterns', 'ExtendPattern', 'GraphMatch', 'PatternList.insert', 'DiscoverPatterns', 'Compress']
+    print("Seconds (best of " + str(repeat) + "):")
+    print("  " + "edges".rjust(8) + ''.join(step.rjust(20) for step in steps))
+    for size in sizes:
+        size_results = benchmark_size({'seed': seed, 'num_edges': size, 'temporal': temporal}, repeat)
+        results['sizes'].append(size_results)
+        print("  " + str(size).rjust(8) + ''.join(('%.4f' % (size_results['timings'][step] or 0)).rjust(20) for step in steps),
+              flush=True)
+    with open(output_file_name, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+        output_file.write('\n')
+    print("Results written to " + output_file_name)
+    if baseline_file_name:
+        with open(baseline_file_name) as baseline_file:
+            baseline = json.load(baseline_file)
+        if not compare_with_baseline(results, baseline):
+            print("Best patterns differ from baseline " + baseline_file_name)
+            sys.exit(1)
+        print("Best patterns identical to baseline " + baseline_file_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Compares the graph matchers (--matcher) on inputgraph2.json: time to discover the best patterns, and the
+# best patterns found by each.
+#
+# Usage (from the testing directory): python benchmark_matchers.py [limit]
+
+import contextlib
+import sys
+import time
+
+sys.path.append('../src')
+import Graph
+import Parameters
+from Subdue import ReadGraph, DiscoverPatterns
+
+benchmark_path = 'inputgraph2.json'
+matchers = ['approximate', 'exact', 'vf2', 'canonical']
+
+
+def run_matcher(graph, matcher, limit):
+    """Returns elapsed time and (value, #instances, #edges) of each best pattern found with the given matcher."""
+    parameters = Parameters.Parameters()
+    parameters.set_parameters_from_kwargs(matcher=matcher, limit=limit)
+    parameters.set_defaults_for_graph(graph)
+    Graph.gMatcher = matcher
+    startTime = time.time()
+    with contextlib.redirect_stdout(None):
+        patternList = DiscoverPatterns(parameters, graph)
+    elapsedTime = time.time() - startTime
+    summary = [(pattern.value, len(pattern.instances), len(pattern.definition.edges)) for pattern in patternList]
+    return elapsedTime, summary
+
+
+def main():
+    limit = 300
+    if len(sys.argv) > 1:
+        limit = int(sys.argv[1])
+    graph = ReadGraph(benchmark_path)
+    print("Graph: " + str(len(graph.vertices)) + " vertices, " + str(len(graph.edges)) + " edges, limit " + str(limit))
+    results = {}
+    for matcher in matchers:
+        elapsedTime, summary = run_matcher(graph, matcher, limit)
+        results[matcher] = summary
+        print("  " + matcher.ljust(12) + " " + ('%.2f' % elapsedTime).rjust(8) + " seconds, best patterns " + str(summary))
+    Graph.gMatcher = 'approximate'
+    if results['exact'] == results['vf2'] == results['canonical']:
+        print("Exact matchers agree on best patterns.")
+    else:
+        print("WARNING: exact matchers disagree on best patterns.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Seeded generator of synthetic graphs with embedded patterns, for benchmarks and tests.
+#
+# The graph is a background of random edges, whose endpoints are drawn with Zipf-like weights so that a few vertices
+# have high degree, plus instances of a random connected pattern, each attached to the background by one edge. Labels
+# of background vertices and edges are drawn from an alphabet of the given size; the pattern uses the same alphabet.
+# With the same arguments, the same graph is generated, in the same order.
+#
+# Usage (from the testing directory): python synthetic_graph.py <num_edges> <output JSON graph file> [seed]
+
+import random
+import sys
+
+sys.path.append('../src')
+import Graph
+
+
+def synthetic_graph_json(seed=1, num_edges=1000, num_labels=8, pattern_size=4, pattern_fraction=0.2,
+                         degree_skew=0.5, temporal=False):
+    """Returns a synthetic graph as a list of vertex and edge objects in the JSON input format.
+
+    :param seed: seed of the random number generator
+    :param num_edges: approximate number of edges
+    :param num_labels: size of the label alphabet of vertices and edges
+    :param pattern_size: number of edges of the embedded pattern
+    :param pattern_fraction: fraction of the edges that belong to instances of the embedded pattern
+    :param degree_skew: exponent of the Zipf-like weights of background vertices; 0 gives uniform degrees
+    :param temporal: if True, the edges of each instance get increasing timestamps in pattern order, and background
+        elements get random timestamps; otherwise, all timestamps are 0
+    """
+    rng = random.Random(seed)
+    labels = ['L' + str(label) for label in range(num_labels)]
+    objects = []
+    vertex_ids = []
+    edge_ids = []
+
+    def add_vertex(label, timestamp):
+        vertex_id = str(len(vertex_ids) + 1)
+        vertex_ids.append(vertex_id)
+        objects.append({'vertex': {'id': vertex_id, 'attributes': {'label': label}, 'timestamp': str(timestamp)}})
+        return vertex_id
+
+    def add_edge(source_id, target_id, label, directed, timestamp):
+        edge_ids.append(str(len(edge_ids) + 1))
+        objects.append({'edge': {'id': edge_ids[-1], 'source': source_id, 'target': target_id,
+                                 'directed': 'true' if directed else 'false', 'attributes': {'label': label},
+                                 'timestamp': str(timestamp)}})
+
+    # the pattern is a random tree plus, if it has enough vertices, one edge closing a cycle
+    num_pattern_vertices = max(2, pattern_size)
+    pattern_vertex_labels = [rng.choice(labels) for _ in range(num_pattern_vertices)]
+    pattern_edges = [(rng.randrange(vertex), vertex) for vertex in range(1, num_pattern_vertices)]
+    if len(pattern_edges) < pattern_size:
+        pattern_edges.append((0, num_pattern_vertices - 1))
+    pattern_edges = [(source, target, rng.choice(labels), rng.random() < 0.5) for source, target in pattern_edges]
+    num_instances = max(2, int((num_edges * pattern_fraction) / (len(pattern_edges) + 1)))
+    num_background_edges = max(1, num_edges - (num_instances * (len(pattern_edges) + 1)))
+    num_background_vertices = max(2, num_background_edges // 2)
+    max_time = num_edges
+
+    for _ in range(num_background_vertices):
+        add_vertex(rng.choice(labels), rng.randrange(max_time) if temporal else 0)
+    background_ids = list(vertex_ids)
+    cum_weights = []
+    total_weight = 0.0
+    for rank in range(num_background_vertices):
+        total_weight += (rank + 1) ** (-degree_skew)
+        cum_weights.append(total_weight)
+    for _ in range(num_background_edges):
+        source_id, target_id = rng.choices(background_ids, cum_weights=cum_weights, k=2)
+        add_edge(source_id, target_id, rng.choice(labels), rng.random() < 0.5, rng.randrange(max_time) if temporal else 0)
+    for _ in range(num_instances):
+        start_time = rng.randrange(max_time) if temporal else 0
+        instance_ids = [add_vertex(label, start_time) for label in pattern_vertex_labels]
+        for edge_num, (source, target, label, directed) in enumerate(pattern_edges):
+            add_edge(instance_ids[source], instance_ids[target], label, directed, (start_time + edge_num) if temporal else 0)
+        add_edge(instance_ids[0], rng.choice(background_ids), rng.choice(labels), False, start_time if temporal else 0)
+    return objects
+
+
+def synthetic_graph(**generator_parameters):
+    """Returns a synthetic graph (see synthetic_graph_json for the parameters)."""
+    graph = Graph.Graph()
+    graph.load_from_json(synthetic_graph_json(**generator_parameters))
+    return graph
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python synthetic_graph.py <num_edges> <output JSON graph file> [seed]")
+        sys.exit(1)
+    seed = 1
+    if len(sys.argv) > 3:
+        seed = int(sys.argv[3])
+    graph = synthetic_graph(seed=seed, num_edges=int(sys.argv[1]))
+    graph.write_to_file(sys.argv[2])
+    print("Wrote " + str(len(graph.vertices)) + " vertices and " + str(len(graph.edges)) + " edges to " + sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
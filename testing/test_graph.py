@@ -0,0 +1,297 @@
+import gzip
+import io
+import itertools
+import json
+import random
+import sys
+
+sys.path.append('../src')
+import BinaryGraph
+import CanonicalCode
+import Graph
+import Pattern
+
+subdue_example_chunk_sizes = {'inputgraph.json': [1, 7, 100], 'inputgraph2.json': [4096, 1048576]}
+
+
+def graph_summary(graph):
+    """Returns the vertices and edges of the given graph as comparable tuples."""
+    vertices = [(vertex.id, vertex.timestamp, vertex.attributes, [edge.id for edge in vertex.edges])
+                for vertex in graph.vertices.values()]
+    edges = [(edge.id, edge.source.id, edge.target.id, edge.directed, edge.timestamp, edge.attributes)
+             for edge in graph.edges.values()]
+    return vertices, edges
+
+
+def test_stream_loader_matches_json_loader():
+    for file_path, chunk_sizes in subdue_example_chunk_sizes.items():
+        with open(file_path) as input_file:
+            json_graph = Graph.Graph()
+            json_graph.load_from_json(json.load(input_file))
+        for chunk_size in chunk_sizes:
+            with open(file_path) as input_file:
+                stream_graph = Graph.Graph()
+                stream_graph.load_from_json_stream(input_file, chunk_size)
+            assert graph_summary(stream_graph) == graph_summary(json_graph)
+
+
+def test_stream_loader_fuses_duplicate_vertices():
+    text = ('[{"vertex": {"id": "1", "attributes": {"label": "a"}, "timestamp": "3"}},'
+            '{"vertex": {"id": "1", "attributes": {"label": "b"}}},'
+            '{"vertex": {"id": "2", "attributes": {"label": "a"}}},'
+            '{"edge": {"id": "1", "source": "1", "target": "2", "directed": "true", "attributes": {}}}]')
+    graph = Graph.Graph()
+    graph.load_from_json_stream(io.StringIO(text), 5)
+    assert len(graph.vertices) == 2
+    assert graph.vertices['1'].attributes == {'label': 'a'}
+    assert graph.vertices['1'].timestamp == 3
+    assert graph.edges['1'].directed
+
+
+def test_stream_loader_rejects_truncated_array():
+    graph = Graph.Graph()
+    try:
+        graph.load_from_json_stream(io.StringIO('[{"vertex": {"id": "1"}},'), 4)
+    except json.JSONDecodeError:
+        return
+    assert False, 'truncated array was accepted'
+
+
+def test_binary_graph_matches_json_graph(tmp_path):
+    for file_path in subdue_example_chunk_sizes:
+        with open(file_path) as input_file:
+            json_graph = Graph.Graph()
+            json_graph.load_from_json(json.load(input_file))
+        binary_path = str(tmp_path / 'graph.bin')
+        BinaryGraph.WriteBinaryGraph(json_graph, binary_path)
+        assert BinaryGraph.IsBinaryGraphFile(binary_path)
+        assert not BinaryGraph.IsBinaryGraphFile(file_path)
+        binary_graph = BinaryGraph.ReadBinaryGraph(binary_path)
+        assert graph_summary(binary_graph) == graph_summary(json_graph)
+
+
+def test_written_graph_is_valid_json(tmp_path):
+    graph = Graph.Graph()
+    for vertex_id, attributes in [('1', {'label': 'say "hi"\\'}), ('2', {'label': 'caf\u00e9', 'weight': 2.5}),
+                                  ('3', {'label': 'a\nb', 'count': 3, 'flag': True})]:
+        vertex = Graph.Vertex(vertex_id)
+        vertex.timestamp = int(vertex_id)
+        vertex.set_attributes(attributes)
+        graph.vertices[vertex_id] = vertex
+    add_edge(graph, 'e"1', '1', '2', True, 'x')
+    add_edge(graph, 'e2', '2', '3', False, '{y}')
+    for compress in [False, True]:
+        output_path = str(tmp_path / 'graph.json')
+        graph.write_to_file(output_path, compress)
+        open_file = gzip.open if compress else open
+        with open_file(output_path, 'rt', encoding='utf-8') as input_file:
+            written_graph = Graph.Graph()
+            written_graph.load_from_json(json.load(input_file))
+        assert graph_summary(written_graph) == graph_summary(graph)
+
+
+def random_graph(rng, num_vertices, num_edges):
+    """Returns a random connected graph with few labels, so that many vertices and edges look alike."""
+    graph = Graph.Graph()
+    for vertex_num in range(num_vertices):
+        vertex = Graph.Vertex(str(vertex_num))
+        vertex.set_attributes({'label': rng.choice('ab')})
+        graph.vertices[vertex.id] = vertex
+    vertex_ids = list(graph.vertices)
+    for edge_num in range(num_edges):
+        if edge_num < num_vertices - 1:
+            source_id, target_id = vertex_ids[edge_num + 1], rng.choice(vertex_ids[:edge_num + 1])
+        else:
+            source_id, target_id = rng.choice(vertex_ids), rng.choice(vertex_ids)
+        add_edge(graph, str(edge_num), source_id, target_id, rng.random() < 0.5, rng.choice('xy'))
+    return graph
+
+
+def add_edge(graph, edge_id, source_id, target_id, directed, label):
+    edge = Graph.Edge(edge_id, graph.vertices[source_id], graph.vertices[target_id], directed)
+    edge.set_attributes({'label': label})
+    graph.edges[edge_id] = edge
+    edge.source.add_edge(edge)
+    edge.target.add_edge(edge)
+
+
+def permuted_graph(rng, graph):
+    """Returns a copy of the given graph with vertices renamed and vertices and edges reordered."""
+    vertex_ids = list(graph.vertices)
+    new_ids = dict(zip(vertex_ids, rng.sample(vertex_ids, len(vertex_ids))))
+    new_graph = Graph.Graph()
+    for vertex_id in rng.sample(vertex_ids, len(vertex_ids)):
+        vertex = Graph.Vertex(new_ids[vertex_id])
+        vertex.set_attributes(graph.vertices[vertex_id].attributes)
+        new_graph.vertices[vertex.id] = vertex
+    for edge in rng.sample(list(graph.edges.values()), len(graph.edges)):
+        source_id, target_id = new_ids[edge.source.id], new_ids[edge.target.id]
+        if (not edge.directed) and rng.random() < 0.5:
+            source_id, target_id = target_id, source_id
+        add_edge(new_graph, edge.id, source_id, target_id, edge.directed, edge.attributes['label'])
+    return new_graph
+
+
+def brute_force_match(graph1, graph2):
+    """Returns True if some vertex bijection maps the edge multiset of graph1 onto that of graph2."""
+    def edge_multiset(graph, vertex_names):
+        edges = []
+        for edge in graph.edges.values():
+            endpoints = (vertex_names[edge.source.id], vertex_names[edge.target.id])
+            if not edge.directed:
+                endpoints = tuple(sorted(endpoints))
+            edges.append((endpoints, edge.directed, edge.label))
+        return sorted(edges)
+    vertex_ids1, vertex_ids2 = list(graph1.vertices), list(graph2.vertices)
+    if len(vertex_ids1) != len(vertex_ids2) or len(graph1.edges) != len(graph2.edges):
+        return False
+    labels2 = [graph2.vertices[vertex_id].label for vertex_id in vertex_ids2]
+    edges2 = edge_multiset(graph2, {vertex_id: num for num, vertex_id in enumerate(vertex_ids2)})
+    for permutation in itertools.permutations(range(len(vertex_ids1))):
+        if [graph1.vertices[vertex_id].label for vertex_id in vertex_ids1] != [labels2[num] for num in permutation]:
+            continue
+        if edge_multiset(graph1, dict(zip(vertex_ids1, permutation))) == edges2:
+            return True
+    return False
+
+
+def test_vf2_matcher_is_exact(monkeypatch):
+    # also with every graph matched by vertex mapping, rather than small graphs by edge mapping
+    for small_graph_edges in [Graph.gSmallGraphEdges, 0]:
+        monkeypatch.setattr(Graph, 'gSmallGraphEdges', small_graph_edges)
+        rng = random.Random(1)
+        for trial in range(300):
+            num_vertices = rng.randint(1, 5)
+            num_edges = rng.randint(max(num_vertices - 1, 0), 7)
+            graph1 = random_graph(rng, num_vertices, num_edges)
+            assert Graph.GraphMatch_VF2(graph1, permuted_graph(rng, graph1))
+            graph2 = random_graph(rng, num_vertices, num_edges)
+            assert Graph.GraphMatch_VF2(graph1, graph2) == brute_force_match(graph1, graph2)
+    # all vertices and edges alike, so only the vertex mapping tells a 6-cycle from two triangles
+    graphs = []
+    for cycles in [[range(6)], [range(3), range(3, 6)]]:
+        graph = Graph.Graph()
+        for vertex_num in range(6):
+            vertex = Graph.Vertex(str(vertex_num))
+            vertex.set_attributes({'label': 'a'})
+            graph.vertices[vertex.id] = vertex
+        for cycle in cycles:
+            for position, vertex_num in enumerate(cycle):
+                add_edge(graph, str(vertex_num), str(vertex_num), str(cycle[(position + 1) % len(cycle)]), False, 'x')
+        graphs.append(graph)
+    assert not Graph.GraphMatch_VF2(graphs[0], graphs[1])
+
+
+def test_canonical_code_identifies_isomorphism_classes():
+    rng = random.Random(2)
+    for trial in range(300):
+        num_vertices = rng.randint(1, 6)
+        num_edges = rng.randint(max(num_vertices - 1, 0), 8)
+        graph1 = random_graph(rng, num_vertices, num_edges)
+        assert CanonicalCode.CanonicalCode(graph1) == CanonicalCode.CanonicalCode(permuted_graph(rng, graph1))
+        graph2 = random_graph(rng, num_vertices, num_edges)
+        same_code = CanonicalCode.CanonicalCode(graph1) == CanonicalCode.CanonicalCode(graph2)
+        assert same_code == brute_force_match(graph1, graph2)
+
+
+def test_canonical_code_of_symmetric_graph():
+    star = Graph.Graph()
+    for vertex_num in range(12):
+        vertex = Graph.Vertex(str(vertex_num))
+        vertex.set_attributes({'label': 'a'})
+        star.vertices[vertex.id] = vertex
+    for vertex_num in range(1, 12):
+        add_edge(star, str(vertex_num), '0', str(vertex_num), False, 'x')
+    assert len(CanonicalCode.CanonicalCode(star)[1]) == 11
+
+
+def test_elements_keep_their_own_attributes(tmp_path):
+    graph = Graph.Graph()
+    for vertex_id, attributes in [('1', {'w': 1, 'label': 'a'}), ('2', {'w': True, 'label': 'a'}),
+                                  ('3', {'label': 'a', 'w': 1}), ('4', {'w': 1, 'label': 'a'})]:
+        vertex = Graph.Vertex(vertex_id)
+        vertex.set_attributes(attributes)
+        graph.vertices[vertex_id] = vertex
+    vertices = graph.vertices
+    # equal attributes match, but each vertex keeps the types and key order it was given
+    assert vertices['1'].label == vertices['2'].label == vertices['3'].label
+    assert vertices['2'].attributes['w'] is True
+    assert list(vertices['3'].attributes) == ['label', 'w']
+    assert vertices['4'].attributes is vertices['1'].attributes
+    binary_path = str(tmp_path / 'graph.bin')
+    BinaryGraph.WriteBinaryGraph(graph, binary_path)
+    json_path = str(tmp_path / 'graph.json')
+    graph.write_to_file(json_path)
+    with open(json_path) as input_file:
+        json_graph = Graph.Graph()
+        json_graph.load_from_json(json.load(input_file))
+    for written_graph in [BinaryGraph.ReadBinaryGraph(binary_path), json_graph]:
+        for vertex_id, vertex in graph.vertices.items():
+            written_attributes = written_graph.vertices[vertex_id].attributes
+            assert list(written_attributes.items()) == list(vertex.attributes.items())
+            assert [type(value) for value in written_attributes.values()] == [type(value) for value in vertex.attributes.values()]
+
+
+def test_unhashable_attribute_values_keep_labels_apart():
+    labels = [Graph.LabelId(attributes) for attributes in
+              [{'x': [1]}, {'x': '[1]'}, {'x': [1], 'y': 'a'}, {'x': '[1]', 'y': 'a'}, {'y': 'a', 'x': [1]}]]
+    assert labels[0] != labels[1] and labels[2] != labels[3] and labels[2] == labels[4]
+    signatures = []
+    for value in [[1], '[1]']:
+        graph = Graph.Graph()
+        for vertex_id in ['1', '2']:
+            vertex = Graph.Vertex(vertex_id)
+            vertex.set_attributes({'label': 'a'})
+            graph.vertices[vertex_id] = vertex
+        edge = Graph.Edge('1', graph.vertices['1'], graph.vertices['2'], True)
+        edge.set_attributes({'x': value})
+        signatures.append(Graph.EdgeSignature(edge))
+    assert signatures[0] != signatures[1]
+
+
+def test_match_cache_evicts_least_recently_used():
+    cache = Graph.MatchCache(2)
+    cache.put('a', True)
+    cache.put('b', False)
+    assert cache.get('a') is True
+    cache.put('c', True)
+    assert cache.get('b') is None
+    assert cache.get('a') is True and cache.get('c') is True
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def compress_edges(graph, iteration, edge_ids):
+    """Compresses graph with a pattern whose instances are the given edges, one per instance."""
+    pattern = Pattern.Pattern()
+    pattern.instances = [Pattern.CreateInstanceFromEdge(graph.edges[edge_id]) for edge_id in edge_ids]
+    return graph.Compress(iteration, pattern)
+
+
+def assert_incidence_consistent(graph):
+    for vertex in graph.vertices.values():
+        for edge in vertex.edges:
+            assert edge.id in graph.edges and vertex in (edge.source, edge.target)
+    for edge in graph.edges.values():
+        assert edge in edge.source.edges and edge in edge.target.edges
+
+
+def test_compress_reconnects_edges_and_self_loops():
+    graph = Graph.Graph()
+    for vertex_id, label in [('1', 'a'), ('2', 'b'), ('3', 'a'), ('4', 'b')]:
+        vertex = Graph.Vertex(vertex_id)
+        vertex.set_attributes({'label': label})
+        graph.vertices[vertex_id] = vertex
+    add_edge(graph, '1', '1', '2', True, 'x')
+    add_edge(graph, '2', '3', '4', True, 'x')
+    add_edge(graph, '3', '2', '1', True, 'y') # becomes a self-loop
+    add_edge(graph, '4', '2', '4', False, 'y') # connects the two instances
+    new_vertices = compress_edges(graph, 1, ['1', '2'])
+    assert sorted(graph.vertices) == ['PATTERN-1-1', 'PATTERN-1-2']
+    assert [edge.id for edge in new_vertices[0].edges] == ['3', '4']
+    assert graph.edges['3'].source is graph.edges['3'].target is new_vertices[0]
+    assert {graph.edges['4'].source, graph.edges['4'].target} == set(new_vertices)
+    assert_incidence_consistent(graph)
+    # compressing the self-loop leaves only the edge between the new vertices
+    compress_edges(graph, 2, ['3'])
+    assert sorted(graph.edges) == ['4']
+    assert_incidence_consistent(graph)
@@ -92,3 +92,11 @@ assert (
     /
     len(prints_main.split('\n'))
 ) < tolerance_pct
+
+
+# budgets: the run is flagged as truncated, but still returns the best patterns found
+output, info = nx_subdue(graph=subdue_example_graph, timeBudget=1e-9, return_info=True)
+assert info['truncated'] and len(output) > 0
+output, info = nx_subdue(graph=subdue_example_graph, return_info=True)
+assert (not info['truncated']) and len(output) > 0
+assert info['stats']['counters']['graphMatches'] > 0 and info['stats']['levels']
@@ -0,0 +1,29 @@
+import sys
+
+sys.path.append('../src')
+from OrderedSet import OrderedSet
+
+
+def test_order_and_set_semantics():
+    s = OrderedSet([3, 1, 2, 1])
+    assert list(s) == [3, 1, 2]
+    assert len(s) == 3 and 2 in s
+    assert list(s - OrderedSet([1])) == [3, 2]
+    assert list(s + OrderedSet([4, 3])) == [3, 1, 2, 4]
+    assert list(s.intersection(OrderedSet([2, 3]))) == [3, 2]
+    assert s.intersect(OrderedSet([2])) and not s.intersect(OrderedSet([5]))
+    assert s == OrderedSet([1, 2, 3]) and s != OrderedSet([1, 2])
+    assert hash(s) == hash(OrderedSet([2, 3, 1]))
+
+
+def test_nested_iteration():
+    s = OrderedSet(['a', 'b', 'c'])
+    pairs = [(x, y) for x in s for y in s]
+    assert len(pairs) == 9
+
+
+def test_copy_is_independent():
+    s = OrderedSet([1, 2])
+    t = OrderedSet(s)
+    t.add(3)
+    assert list(s) == [1, 2] and list(t) == [1, 2, 3]
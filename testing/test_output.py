@@ -0,0 +1,197 @@
+import contextlib
+import io
+import json
+import re
+import sys
+
+sys.path.append('../src')
+import Checkpoint
+import Graph
+import Parameters
+from Subdue import DiscoverPatterns, ReadGraph, Subdue
+from synthetic_graph import synthetic_graph, synthetic_graph_json
+
+subdue_example_path = 'inputgraph.json'
+subdue_example_output_path = 'output.txt'
+
+
+def run_subdue(file_path, **subdue_parameters):
+    """Runs Subdue on the given file and returns the printed output, starting at the graph summary."""
+    parameters = Parameters.Parameters()
+    parameters.set_parameters_from_kwargs(**subdue_parameters)
+    graph = ReadGraph(file_path)
+    parameters.set_defaults_for_graph(graph)
+    capture_prints = io.StringIO()
+    with contextlib.redirect_stdout(capture_prints):
+        Subdue(parameters, graph)
+    return strip_output_text(capture_prints.getvalue())
+
+
+def strip_output_text(text):
+    """Removes the banner, parameter listing and timings, which vary between runs."""
+    text = text[text.index('Graph:'):]
+    return re.sub(r'(Elapsed time.*= )[0-9.]*', r'\1REMOVED', text)
+
+
+def test_output_matches_reference():
+    with open(subdue_example_output_path) as output_file:
+        expected = strip_output_text(output_file.read())
+    assert run_subdue(subdue_example_path) == expected
+
+
+def test_output_independent_of_workers():
+    serial_output = run_subdue(subdue_example_path, iterations=2)
+    parallel_output = run_subdue(subdue_example_path, iterations=2, workers=3)
+    assert parallel_output == serial_output
+
+
+def test_output_independent_of_bound():
+    for file_path, parameters in [(subdue_example_path, {'iterations': 2}), ('inputgraph2.json', {'limit': 30})]:
+        assert run_subdue(file_path, bound=True, **parameters) == run_subdue(file_path, **parameters)
+        assert run_subdue(file_path, bound=True, workers=2, **parameters) == run_subdue(file_path, **parameters)
+
+
+def test_output_independent_of_incremental():
+    for file_path, parameters in [(subdue_example_path, {'iterations': 0}),
+                                  ('inputgraph2.json', {'limit': 15, 'iterations': 3, 'temporal': True})]:
+        assert run_subdue(file_path, incremental=True, **parameters) == run_subdue(file_path, **parameters)
+
+
+def test_label_table_is_reset_for_each_graph():
+    label_counts = []
+    for _ in range(2):
+        run_subdue('inputgraph2.json', limit=10, iterations=2)
+        label_counts.append(len(Graph.gLabelAttributes))
+        assert len(Graph.gLabelAttributes) < 25 # the labels of the graph and of two compressions
+    assert label_counts[0] == label_counts[1]
+
+
+def test_budget_truncates_search():
+    parameters = Parameters.Parameters()
+    parameters.set_parameters_from_kwargs(timeBudget=1e-9, iterations=2)
+    graph = ReadGraph(subdue_example_path)
+    parameters.set_defaults_for_graph(graph)
+    info = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        iterations = Subdue(parameters, graph, info)
+    assert info['truncated']
+    # the initial patterns are still reported, and no further iteration is started
+    assert len(iterations) == 1 and len(iterations[0]) == parameters.numBest
+    parameters = Parameters.Parameters()
+    parameters.set_defaults_for_graph(graph)
+    info = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        Subdue(parameters, ReadGraph(subdue_example_path), info)
+    assert not info['truncated']
+
+
+def run_subdue_stats(file_path, stats_path, **subdue_parameters):
+    parameters = Parameters.Parameters()
+    parameters.set_parameters_from_kwargs(statsFileName=stats_path, **subdue_parameters)
+    graph = ReadGraph(file_path)
+    parameters.set_defaults_for_graph(graph)
+    info = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        Subdue(parameters, graph, info)
+    with open(stats_path) as stats_file:
+        assert json.load(stats_file) == info['stats']
+    return info['stats']
+
+
+def test_stats_count_work_of_all_workers(tmp_path):
+    stats_path = str(tmp_path / 'stats.json')
+    serial_stats = run_subdue_stats('inputgraph2.json', stats_path, limit=20, iterations=2)
+    parallel_stats = run_subdue_stats('inputgraph2.json', stats_path, limit=20, iterations=2, workers=3)
+    assert parallel_stats['counters'] == serial_stats['counters']
+    counters = serial_stats['counters']
+    assert counters['graphMatches'] > 0 and counters['extendInstanceCalls'] > 0
+    assert counters['instancesGenerated'] >= counters['instancesDuplicate']
+    assert [level['iteration'] for level in serial_stats['levels']] == [1, 2]
+    assert serial_stats['levels'][0]['parentPatterns'] == 20
+    assert serial_stats['timers']['compress'] > 0
+    # each worker has its own match cache, so only the number of lookups is the same
+    serial_stats = run_subdue_stats('inputgraph2.json', stats_path, limit=20, matchCacheSize=1000)
+    parallel_stats = run_subdue_stats('inputgraph2.json', stats_path, limit=20, matchCacheSize=1000, workers=3)
+    for stats in [serial_stats, parallel_stats]:
+        counters = stats['counters']
+        assert counters['matchCacheHits'] > 0
+        assert counters['matchCacheHits'] + counters['matchCacheMisses'] == counters['graphMatches']
+    assert parallel_stats['counters']['graphMatches'] == serial_stats['counters']['graphMatches']
+
+
+def test_bound_saves_work_with_workers(tmp_path):
+    stats_path = str(tmp_path / 'stats.json')
+    unbounded_stats = run_subdue_stats('inputgraph2.json', stats_path, limit=100, workers=3)
+    bounded_stats = run_subdue_stats('inputgraph2.json', stats_path, limit=100, workers=3, bound=True)
+    assert bounded_stats['counters']['extendInstanceCalls'] < unbounded_stats['counters']['extendInstanceCalls']
+    # only the parents actually extended are counted
+    assert sum(level['parentPatterns'] for level in unbounded_stats['levels']) == 100
+    assert sum(level['parentPatterns'] for level in bounded_stats['levels']) < 100
+
+
+def test_synthetic_graph_embeds_discoverable_pattern():
+    assert synthetic_graph_json(seed=3, num_edges=500) == synthetic_graph_json(seed=3, num_edges=500)
+    assert synthetic_graph_json(seed=3, num_edges=500) != synthetic_graph_json(seed=4, num_edges=500)
+    graph = synthetic_graph(seed=1, num_edges=1000, pattern_size=4)
+    parameters = Parameters.Parameters()
+    parameters.set_defaults_for_graph(graph)
+    with contextlib.redirect_stdout(io.StringIO()):
+        best_pattern = DiscoverPatterns(parameters, graph)[0]
+    # 20% of the edges are in 40 instances of the 4-edge pattern, each attached to the rest of the graph by one edge
+    assert len(best_pattern.definition.edges) == 4 and len(best_pattern.instances) == 40
+
+
+def test_budget_exceeded_after_search_is_not_truncation(monkeypatch):
+    import Subdue as subdue_module
+    memory = [0]
+    discover_patterns = subdue_module.DiscoverPatterns
+    def discover_then_grow(*args):
+        patterns = discover_patterns(*args)
+        memory[0] = 1e9 # exceeds the budget only once the search is done
+        return patterns
+    monkeypatch.setattr(subdue_module, 'DiscoverPatterns', discover_then_grow)
+    monkeypatch.setattr(subdue_module, 'PeakMemory', lambda: memory[0])
+    parameters = Parameters.Parameters()
+    parameters.set_parameters_from_kwargs(memoryBudget=100)
+    graph = ReadGraph(subdue_example_path)
+    parameters.set_defaults_for_graph(graph)
+    info = {}
+    capture_prints = io.StringIO()
+    with contextlib.redirect_stdout(capture_prints):
+        Subdue(parameters, graph, info)
+    assert not info['truncated']
+    assert 'budget exceeded' not in capture_prints.getvalue()
+
+
+class Preempted(Exception):
+    pass
+
+
+def test_resume_from_checkpoint(tmp_path, monkeypatch):
+    checkpoint_path = str(tmp_path / 'subdue.checkpoint')
+    parameters = {'limit': 60, 'iterations': 3, 'checkpointFileName': checkpoint_path}
+    expected = run_subdue('inputgraph2.json', **parameters)
+    for levels in [2, 6]:
+        # interrupt the run when it would write a checkpoint after the given number of levels
+        save_level = Checkpoint.Checkpoint.save_level
+        level_count = [0]
+        def interrupting_save_level(checkpoint, *args):
+            level_count[0] += 1
+            if level_count[0] > levels:
+                raise Preempted()
+            save_level(checkpoint, *args)
+        monkeypatch.setattr(Checkpoint.Checkpoint, 'save_level', interrupting_save_level)
+        try:
+            run_subdue('inputgraph2.json', **parameters)
+            assert False, 'run was not interrupted'
+        except Preempted:
+            pass
+        monkeypatch.setattr(Checkpoint.Checkpoint, 'save_level', save_level)
+        resumed_parameters = Parameters.Parameters()
+        resumed_parameters.set_parameters_from_kwargs(checkpointFileName=checkpoint_path, resume=True)
+        capture_prints = io.StringIO()
+        with contextlib.redirect_stdout(capture_prints):
+            Subdue(resumed_parameters, None)
+        resumed = strip_output_text(capture_prints.getvalue())
+        # the resumed run ends with the same iterations as the uninterrupted one
+        assert expected.endswith(resumed[resumed.index('Best'):])
@@ -0,0 +1,111 @@
+import random
+import sys
+
+sys.path.append('../src')
+import Graph
+import Parameters
+import Pattern
+from Subdue import ReadGraph, GetInitialPatterns
+
+subdue_example_path = 'inputgraph2.json'
+
+
+def initial_patterns():
+    parameters = Parameters.Parameters()
+    graph = ReadGraph(subdue_example_path)
+    parameters.set_defaults_for_graph(graph)
+    return GetInitialPatterns(parameters, graph)
+
+
+def pattern_list_insert(new_pattern, pattern_list, max_length, value_based):
+    """Reference implementation of PatternList.insert on a plain list, matching new_pattern against every pattern."""
+    for pattern in pattern_list:
+        if Graph.GraphMatch(pattern.definition, new_pattern.definition):
+            if pattern.value >= new_pattern.value:
+                return # new_pattern already on list with same or better value
+            pattern_list.remove(pattern)
+            break
+    insert_at_index = 0
+    for pattern in pattern_list:
+        if new_pattern.value > pattern.value:
+            break
+        insert_at_index += 1
+    pattern_list.insert(insert_at_index, new_pattern)
+    if value_based:
+        unique_values = []
+        for pattern in pattern_list:
+            if pattern.value not in unique_values:
+                unique_values.append(pattern.value)
+        if len(unique_values) > max_length:
+            while pattern_list[-1].value == unique_values[-1]:
+                pattern_list.pop(-1)
+    elif len(pattern_list) > max_length:
+        pattern_list.pop(-1)
+
+
+def test_pattern_list_matches_pattern_list_insert():
+    patterns = initial_patterns()
+    rng = random.Random(0)
+    for max_length, value_based in [(1, False), (4, False), (10, False), (2, True), (4, True)]:
+        for trial in range(20):
+            # repeat patterns with different values, so that duplicates and ties occur
+            sequence = [(pattern, rng.choice([0.5, 1.0, 1.5, 2.0])) for pattern in rng.choices(patterns, k=30)]
+            pattern_list = Pattern.PatternList(max_length, value_based)
+            expected = []
+            for pattern, value in sequence:
+                new_pattern = Pattern.Pattern()
+                new_pattern.definition = pattern.definition
+                new_pattern.value = value
+                pattern_list.insert(new_pattern)
+                pattern_list_insert(new_pattern, expected, max_length, value_based)
+                assert list(pattern_list) == expected
+
+
+def test_instance_temporal_order_matches_graph_temporal_order():
+    instances = [instance for pattern in initial_patterns() for instance in pattern.instances[:5]]
+    for depth in range(3):
+        instances = [new_instance for instance in instances for new_instance in Pattern.ExtendInstance(instance)[:3]]
+        for instance in instances:
+            graph = Graph.CreateGraphFromInstance(instance)
+            graph.TemporalOrder()
+            temporal_graph = Graph.CreateGraphFromInstance(instance, temporal=True)
+            assert ([vertex.temporal for vertex in temporal_graph.vertices.values()] ==
+                    [vertex.temporal for vertex in graph.vertices.values()])
+            assert ([edge.temporal for edge in temporal_graph.edges.values()] ==
+                    [edge.temporal for edge in graph.edges.values()])
+
+
+def test_instance_identity_depends_only_on_edges():
+    instances = [instance for pattern in initial_patterns() for instance in pattern.instances[:5]]
+    for depth in range(2):
+        instances = [new_instance for instance in instances for new_instance in Pattern.ExtendInstance(instance)[:4]]
+    index = Pattern.InstanceIndex()
+    edge_sets = set()
+    for instance in instances:
+        # an instance with the same edges, built in one step rather than by extension
+        copy = Pattern.Instance()
+        for edge in reversed(list(instance.iter_edges())):
+            copy.edges.add(edge)
+        assert copy.identity_hash() == instance.identity_hash() and Pattern.SameEdges(copy, instance)
+        assert index.contains(copy) == (frozenset(instance.iter_edges()) in edge_sets)
+        index.add(instance)
+        edge_sets.add(frozenset(instance.iter_edges()))
+
+
+def test_value_bound_bounds_extension_values():
+    parameters = Parameters.Parameters()
+    graph = ReadGraph(subdue_example_path)
+    parameters.set_defaults_for_graph(graph)
+    for overlap in ['none', 'vertex']:
+        parameters.overlap = overlap
+        patterns = GetInitialPatterns(parameters, graph)[:3]
+        for depth in range(3):
+            extended_patterns = []
+            for pattern in patterns:
+                size = len(pattern.definition.edges)
+                bound = pattern.value_bound(graph, overlap, size + 1, size + 1)
+                for extended_pattern in Pattern.ExtendPattern(parameters, pattern):
+                    extended_pattern.evaluate(graph)
+                    assert extended_pattern.value <= bound
+                    extended_patterns.append(extended_pattern)
+            patterns = sorted(extended_patterns, key=lambda pattern: -pattern.value)[:3]